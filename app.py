@@ -1,9 +1,14 @@
+import time
+
+# Measured from the top of the import so startup timings include loading the app
+_import_started = time.perf_counter()
+
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
-from src.api.routes import embedding_routes, metrics_routes, status_routes
+from src.api.routes import embedding_routes, metrics_routes, openai_routes, status_routes
 from src.utils.logger import setup_logger
 from src.utils.config_loader import load_config
-
-app = FastAPI(title="Embedding Service", version="1.0.0")
+from src.utils.memory import process_memory
 
 # Setup logging
 logger = setup_logger()
@@ -11,15 +16,42 @@ logger = setup_logger()
 # Load configuration
 config = load_config()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load and warm up the default model before the service reports ready"""
+    logger.info("Starting up embedding service")
+    app.state.ready = False
+    imported = time.perf_counter()
+
+    registry = embedding_routes.model_registry
+    await registry.get()
+    app.state.startup = {
+        "import_seconds": imported - _import_started,
+        **registry.load_times[registry.default_model],
+        "total_seconds": time.perf_counter() - _import_started,
+        "memory": process_memory()
+    }
+    app.state.ready = True
+    memory = app.state.startup["memory"]
+    logger.info(
+        f"Ready in {app.state.startup['total_seconds']:.1f}s "
+        f"(import {app.state.startup['import_seconds']:.1f}s, "
+        f"model load {app.state.startup['load_seconds']:.1f}s, "
+        f"warmup {app.state.startup['warmup_seconds']:.1f}s); "
+        f"RSS {memory.get('rss_mb', 0.0):.0f} MB, PSS {memory.get('pss_mb', 0.0):.0f} MB, "
+        f"private {memory.get('private_mb', 0.0):.0f} MB"
+    )
+
+    yield
+
+    logger.info("Shutting down embedding service")
+    app.state.ready = False
+    await registry.close()
+
+app = FastAPI(title="Embedding Service", version="1.0.0", lifespan=lifespan)
+
 # Include routers
 app.include_router(embedding_routes.router, tags=["embeddings"])
 app.include_router(metrics_routes.router, tags=["metrics"])
 app.include_router(status_routes.router, tags=["status"])
-
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Starting up embedding service")
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info("Shutting down embedding service")
\ No newline at end of file
+app.include_router(openai_routes.router, tags=["openai"])
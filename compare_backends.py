@@ -0,0 +1,70 @@
+import time
+from typing import List, Optional
+import numpy as np
+import typer
+
+from src.services.backends import BACKEND_NAMES, create_inference_backend
+from src.utils.config_loader import load_config
+from src.utils.constants import DEFAULT_MODEL_NAME
+from src.utils.corpus import load_corpus
+
+app = typer.Typer()
+
+REFERENCE_BACKEND = "torch"
+
+def _run(backend, texts: List[str], batch_size: int):
+    """Encode texts in batches, returning the embeddings and per-batch latencies in ms"""
+    backend.encode(texts[:batch_size])  # warm-up
+    embeddings = []
+    latencies = []
+    for start in range(0, len(texts), batch_size):
+        started = time.perf_counter()
+        embeddings.append(backend.encode(texts[start:start + batch_size]))
+        latencies.append((time.perf_counter() - started) * 1000)
+    return np.concatenate(embeddings), np.array(latencies)
+
+def _cosine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.sum(a * b, axis=1)
+
+@app.command()
+def compare(
+    corpus: Optional[str] = typer.Option(None, help="Text file with one sample per line"),
+    backends: str = typer.Option("onnx,onnx-int8", help="Comma-separated backends to compare"),
+    batch_size: int = 32,
+    repeat: int = typer.Option(4, help="Times to repeat the corpus for steadier timings"),
+    model_name: Optional[str] = None
+):
+    """Report latency and cosine drift of each backend against the torch reference"""
+    model_config = load_config().get("model", {})
+    model_config["name"] = model_name or model_config.get("name", DEFAULT_MODEL_NAME)
+    texts = load_corpus(corpus, repeat)
+
+    names = [name.strip() for name in backends.split(",") if name.strip()]
+    unknown = [name for name in names if name not in BACKEND_NAMES]
+    if unknown:
+        raise typer.BadParameter(f"Unknown backends: {', '.join(unknown)}")
+    names = [REFERENCE_BACKEND] + [name for name in names if name != REFERENCE_BACKEND]
+
+    typer.echo(f"{model_config['name']}: {len(texts)} texts, batch size {batch_size}")
+    typer.echo(
+        f"{'backend':<10} {'texts/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'mean cos':>9} {'min cos':>9}"
+    )
+
+    reference = None
+    for name in names:
+        backend = create_inference_backend({**model_config, "backend": name})
+        embeddings, latencies = _run(backend, texts, batch_size)
+        if reference is None:
+            reference = embeddings
+        cosine = _cosine(embeddings, reference)
+        typer.echo(
+            f"{name:<10} {len(texts) / (latencies.sum() / 1000):>9.1f} "
+            f"{np.percentile(latencies, 50):>8.1f} {np.percentile(latencies, 95):>8.1f} "
+            f"{cosine.mean():>9.5f} {cosine.min():>9.5f}"
+        )
+
+if __name__ == "__main__":
+    app()
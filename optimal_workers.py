@@ -1,15 +1,115 @@
 import multiprocessing
-import math
+import time
+from typing import List, Optional, Tuple
+import numpy as np
+import typer
 
-def get_optimal_workers():
-    cores = multiprocessing.cpu_count()
-    # Using common formula: (2 * cores) + 1
-    optimal = (2 * cores) + 1
-    
-    # Cap at reasonable maximum
-    return min(optimal, 8)
+from src.services.backends import create_inference_backend
+from src.utils.config_loader import load_config
+from src.utils.corpus import load_corpus
+from src.utils.cpu_topology import CpuPlan, pin_process, plan_cpus
+
+app = typer.Typer()
+
+def get_optimal_workers() -> int:
+    return plan_cpus().workers
+
+def _candidates(budget: int) -> List[Tuple[int, int]]:
+    """(workers, threads) pairs that fill the thread budget, from one wide worker to many narrow ones"""
+    threads = {budget}
+    t = 1
+    while t < budget:
+        threads.add(t)
+        t *= 2
+    return sorted(((budget // t, t) for t in threads), reverse=True)
+
+def _bench_worker(backend, plan: CpuPlan, index: int, texts: List[str], batch_size: int, barrier, results):
+    try:
+        pin_process(plan.worker_cpus(index), plan.threads)
+        backend.encode(texts[:batch_size])  # warm-up, after pinning so thread pools start the right size
+        barrier.wait()
+    except Exception as e:
+        # Release the other workers too, so the parent is not left waiting
+        barrier.abort()
+        results.put(e)
+        return
+    started = time.perf_counter()
+    latencies = []
+    for start in range(0, len(texts), batch_size):
+        batch_started = time.perf_counter()
+        backend.encode(texts[start:start + batch_size])
+        latencies.append((time.perf_counter() - batch_started) * 1000)
+    results.put((time.perf_counter() - started, latencies))
+
+def _run_plan(backend, plan: CpuPlan, texts: List[str], batch_size: int) -> Tuple[float, float]:
+    """Encode texts in every worker at once; return total texts/s and p50 batch latency in ms"""
+    # Forked so the workers share the parent's weights, as in the pre-fork server
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(plan.workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=_bench_worker, args=(backend, plan, index, texts, batch_size, barrier, results))
+        for index in range(plan.workers)
+    ]
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    for outcome in outcomes:
+        if isinstance(outcome, Exception):
+            raise RuntimeError(f"Benchmark worker failed: {outcome}")
+
+    elapsed = max(seconds for seconds, _ in outcomes)
+    latencies = np.concatenate([latencies for _, latencies in outcomes])
+    return plan.workers * len(texts) / elapsed, float(np.percentile(latencies, 50))
+
+@app.command()
+def plan(
+    workers: Optional[int] = None,
+    threads: Optional[int] = None
+):
+    """Print the workers x intra-op threads plan for this host"""
+    typer.echo(plan_cpus(workers, threads).describe())
+
+@app.command()
+def benchmark(
+    corpus: Optional[str] = typer.Option(None, help="Text file with one sample per line"),
+    batch_size: int = 16,
+    repeat: int = typer.Option(4, help="Times each worker encodes the corpus"),
+    model_name: Optional[str] = None,
+    backend: Optional[str] = None
+):
+    """Sweep workers x threads splits of the CPU budget and report the fastest.
+
+    Every worker encodes the whole corpus, so the work grows with the worker
+    count and texts/s compares total throughput across splits.
+    """
+    model_config = load_config().get("model", {})
+    model_config = {
+        **model_config,
+        "name": model_name or model_config.get("name"),
+        "backend": backend or model_config.get("backend", "torch")
+    }
+    texts = load_corpus(corpus, repeat)
+    budget = plan_cpus().budget
+    # Loaded once and not run before forking; see _bench_worker
+    inference_backend = create_inference_backend(model_config)
+
+    typer.echo(f"{model_config['name']} on {inference_backend.name}, {len(texts)} texts per worker, "
+               f"thread budget {budget}")
+    typer.echo(f"{'workers':>8} {'threads':>8} {'texts/s':>10} {'p50 ms':>9}")
+    best = None
+    for workers, threads in _candidates(budget):
+        throughput, p50 = _run_plan(inference_backend, plan_cpus(workers, threads), texts, batch_size)
+        typer.echo(f"{workers:>8} {threads:>8} {throughput:>10.1f} {p50:>9.1f}")
+        if best is None or throughput > best[0]:
+            best = (throughput, workers, threads)
+
+    typer.echo(
+        f"Fastest: {best[1]} workers x {best[2]} threads ({best[0]:.1f} texts/s); "
+        f"start with WORKERS={best[1]} INTRA_OP_THREADS={best[2]}"
+    )
 
 if __name__ == "__main__":
-    workers = get_optimal_workers()
-    print(f"Number of CPU cores: {multiprocessing.cpu_count()}")
-    print(f"Recommended number of workers: {workers}")
\ No newline at end of file
+    app()
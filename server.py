@@ -1,21 +1,28 @@
 import uvicorn
-import multiprocessing
 import os
+import sys
 import typer
 from typing import Optional
 
+from src.utils.cpu_topology import INTRA_OP_THREADS_ENV, CpuPlan, plan_cpus
+
 app = typer.Typer()
 
-def get_workers_count(workers: Optional[int] = None) -> int:
-    """Calculate number of workers based on input or environment"""
-    if workers is not None:
-        return workers
-    
-    if os.getenv("WORKERS"):
-        return int(os.getenv("WORKERS"))
-    
-    cores = multiprocessing.cpu_count()
-    return min((2 * cores) + 1, 8)  # Cap at 8 workers
+def get_cpu_plan(workers: Optional[int] = None, threads: Optional[int] = None) -> CpuPlan:
+    """Plan workers x intra-op threads from input, environment or the CPU topology"""
+    if workers is None and os.getenv("WORKERS"):
+        workers = int(os.getenv("WORKERS"))
+    if threads is None and os.getenv(INTRA_OP_THREADS_ENV):
+        threads = int(os.getenv(INTRA_OP_THREADS_ENV))
+    return plan_cpus(workers, threads)
+
+def _preload_default_model():
+    from src.services.backends import preload_inference_backend
+    from src.utils.config_loader import load_config
+    from src.utils.logger import setup_logger
+
+    setup_logger()
+    preload_inference_backend(load_config().get("model", {}))
 
 @app.command()
 def start_server(
@@ -23,27 +30,44 @@ def start_server(
     port: int = int(os.getenv("PORT", "8123")),
     workers: Optional[int] = None,
     reload: bool = os.getenv("RELOAD", "").lower() == "true",
-    env: str = os.getenv("ENVIRONMENT", "development")
+    env: str = os.getenv("ENVIRONMENT", "development"),
+    share_weights: bool = os.getenv("SHARE_WEIGHTS", "").lower() == "true",
+    architecture: str = os.getenv("ARCHITECTURE", "inline"),
+    threads: Optional[int] = typer.Option(None, help="Intra-op threads per worker (env INTRA_OP_THREADS)")
 ):
-    """Start the FastAPI server with environment-aware configuration"""
-    
-    workers_count = get_workers_count(workers)
+    """Start the FastAPI server with environment-aware configuration.
+
+    With --share-weights the default model is loaded once in a parent process
+    that then forks the workers, so they share its weights instead of each
+    loading a copy.
+
+    With --architecture shared-inference the workers only handle HTTP,
+    validation and caching, and hand every encode to one inference process
+    that batches across all of them. --architecture inline (the default)
+    runs the model inside each worker.
+
+    Unless given, the worker and thread counts come from the CPU plan:
+    physical cores available to this process, capped by the cgroup CPU
+    quota. Pre-forked workers are pinned to their own cores.
+    """
+    if architecture not in ("inline", "shared-inference"):
+        raise typer.BadParameter("architecture must be 'inline' or 'shared-inference'")
     
     # Development settings
     if env == "development":
         reload = True
-        workers_count = 1  # Use single worker with reload
+        workers = 1  # Use single worker with reload
         access_log = True
     else:
         reload = False
         access_log = False
+
+    plan = get_cpu_plan(workers, threads)
+    workers_count = plan.workers
     
-    config = uvicorn.Config(
-        "app:app",
+    config_kwargs = dict(
         host=host,
         port=port,
-        workers=workers_count,
-        reload=reload,
         log_level="info" if env == "development" else "warning",
         loop="auto",
         http="auto",
@@ -52,9 +76,80 @@ def start_server(
         access_log=access_log,
         use_colors=True
     )
+
+    if architecture == "shared-inference" and not reload:
+        from src.services.remote_inference import serve_shared_inference
+
+        # HTTP workers run no model, so the inference process gets the whole budget
+        typer.echo(f"{workers_count} HTTP workers, inference process with {plan.budget} intra-op threads")
+        exit_code = serve_shared_inference(
+            {"app": "app:app", **config_kwargs}, workers_count, inference_threads=plan.budget
+        )
+        raise typer.Exit(exit_code)
+
+    typer.echo(plan.describe())
+    if share_weights and not reload:
+        from src.utils.cpu_topology import pin_process
+        from src.utils.prefork import serve_prefork
+
+        serve_prefork(
+            {"app": "app:app", **config_kwargs},
+            workers_count,
+            _preload_default_model,
+            worker_init=lambda index: pin_process(plan.worker_cpus(index), plan.threads)
+        )
+        return
+
+    # Workers started by uvicorn are not told their index, so they are not
+    # pinned; capping their thread pools still stops oversubscription
+    os.environ["OMP_NUM_THREADS"] = str(plan.threads)
+    os.environ["MKL_NUM_THREADS"] = str(plan.threads)
+    os.environ[INTRA_OP_THREADS_ENV] = str(plan.threads)
+
+    config = uvicorn.Config(
+        "app:app",
+        workers=workers_count,
+        reload=reload,
+        **config_kwargs
+    )
     
     server = uvicorn.Server(config)
     server.run()
 
+@app.command()
+def embed_files(
+    input_dir: str,
+    output: str = "embeddings",
+    pattern: str = "*.txt",
+    batch_size: int = 32,
+    model_name: Optional[str] = None,
+    backend: Optional[str] = None,
+    resume: bool = True
+):
+    """Embed a folder of text files in-process into a memory-mapped .npy matrix"""
+    # Imported here so start-server does not pay for loading the model stack
+    from src.services.bulk_embedding import embed_files as run_embed_files
+    from src.utils.config_loader import load_config
+    from src.utils.constants import DEFAULT_MODEL_NAME
+    from src.utils.logger import setup_logger
+
+    setup_logger()
+    model_config = load_config().get("model", {})
+    model_name = model_name or model_config.get("name", DEFAULT_MODEL_NAME)
+    matrix_path = run_embed_files(
+        input_dir,
+        output,
+        model_name,
+        pattern=pattern,
+        batch_size=batch_size,
+        resume=resume,
+        backend=backend or model_config.get("backend", "torch")
+    )
+    typer.echo(f"Embeddings written to {matrix_path} (row ids in {output}.ids.txt)")
+
 if __name__ == "__main__":
+    # A bare `python server.py [options]` starts the server, as it did
+    # before embed-files made this a multi-command app
+    if len(sys.argv) == 1 or (sys.argv[1].startswith("-") and sys.argv[1] not in ("--help", "--install-completion", "--show-completion")):
+        sys.argv.insert(1, "start-server")
     app()
\ No newline at end of file
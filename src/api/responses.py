@@ -0,0 +1,116 @@
+from typing import Any, Optional, Sequence
+import json
+import struct
+import numpy as np
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+BINARY_MEDIA_TYPE = "application/octet-stream"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# Binary body: this header followed by rows * dim little-endian values.
+# Fields are magic, format version, dtype code, reserved, rows, dim. The dtype
+# code is "f" for float32, "b" for int8 and "B" for bit-packed uint8, where dim
+# counts bytes per row.
+BINARY_HEADER = struct.Struct("<4sBcHII")
+BINARY_DTYPE_CODES = {"float32": b"f", "int8": b"b", "uint8": b"B"}
+BINARY_MAGIC = b"EMB1"
+BINARY_VERSION = 1
+
+def _accepted_media_types(request: Request) -> list[str]:
+    accept = request.headers.get("accept", "")
+    return [part.split(";")[0].strip().lower() for part in accept.split(",") if part.strip()]
+
+def _to_builtin(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {key: _to_builtin(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(item) for item in value]
+    return value
+
+def _to_wire(array: np.ndarray) -> np.ndarray:
+    """Little-endian contiguous copy; floats go out as float32, integer codes unchanged"""
+    dtype = array.dtype if array.dtype.kind in "iu" else np.dtype("<f4")
+    return np.ascontiguousarray(array, dtype=dtype.newbyteorder("<"))
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return _to_wire(value).tobytes()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def encode_json(payload: Any) -> bytes:
+    """Serialize a payload that may contain NumPy arrays to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_to_builtin, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(_to_builtin(payload), separators=(",", ":")).encode("utf-8")
+
+def encode_binary(embeddings: np.ndarray) -> bytes:
+    matrix = _to_wire(np.atleast_2d(embeddings))
+    rows, dim = matrix.shape
+    dtype_code = BINARY_DTYPE_CODES[matrix.dtype.name]
+    return BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, dtype_code, 0, rows, dim) + matrix.tobytes()
+
+def embedding_response(
+    request: Request,
+    payload: dict,
+    embeddings: Optional[np.ndarray],
+    cache_hits: Sequence[bool] = ()
+) -> Response:
+    """Serialize an embedding payload in the format the caller asked for.
+
+    `payload` is the JSON body with NumPy arrays in place of float lists.
+    Callers that send `Accept: application/octet-stream` get the raw matrix
+    behind BINARY_HEADER, with per-row cache hits in the X-Cache-Hits
+    header. `Accept: application/msgpack` gets the payload as msgpack with
+    each vector packed as little-endian bytes of its dtype. Everyone else gets
+    JSON, serialized straight from the arrays with orjson when it is
+    installed, without going through Pydantic validation.
+    """
+    accepted = _accepted_media_types(request)
+
+    if BINARY_MEDIA_TYPE in accepted and embeddings is not None:
+        return Response(
+            content=encode_binary(embeddings),
+            media_type=BINARY_MEDIA_TYPE,
+            headers={"X-Cache-Hits": ",".join("1" if hit else "0" for hit in cache_hits)}
+        )
+
+    msgpack_type = next((media_type for media_type in accepted if media_type in MSGPACK_MEDIA_TYPES), None)
+    if msgpack_type is not None:
+        if msgpack is None:
+            raise HTTPException(status_code=406, detail="msgpack responses require the 'msgpack' package")
+        return Response(
+            content=msgpack.packb(payload, default=_msgpack_default),
+            media_type=msgpack_type
+        )
+
+    return Response(content=encode_json(payload), media_type=JSON_MEDIA_TYPE)
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse for handlers that keep reading the request body while streaming.
+
+    The stock StreamingResponse listens for client disconnects on receive(),
+    which would swallow the request body chunks the generator is reading.
+    Here the generator owns receive(); a disconnect surfaces as ClientDisconnect
+    from Request.stream() instead.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
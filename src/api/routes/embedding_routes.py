@@ -1,44 +1,169 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from src.models.pydantic_models import (
     EmbeddingRequest, 
     EmbeddingResponse, 
     StatusResponse, 
     ResultResponse,
     SyncEmbeddingRequest,
-    SyncEmbeddingResponse
+    SyncEmbeddingResponse,
+    BatchEmbeddingRequest,
+    BatchEmbeddingResponse,
+    EmbeddingEncoding,
+    Priority
+)
+from src.api.responses import (
+    NDJSON_MEDIA_TYPE,
+    DuplexStreamingResponse,
+    embedding_response,
+    encode_json
 )
 from src.services.worker import WorkerService
 from src.services.cache_service import CacheService
+from src.services.cache_backends import create_cache_backend, create_l2_backend
+from src.services.backends import InferenceBackend
+from src.services.model_registry import ModelRegistry
+from src.services.remote_inference import InputTooLargeError, RemoteInferenceEngine, get_remote_client
 from src.services.request_tracker import RequestTracker
 from src.services.metrics_service import MetricsService
+from src.services.quantization import apply_output_options, validate_output_options
 from src.utils.logger import get_logger
+from src.utils.config_loader import load_config
+from src.utils.constants import (
+    DEFAULT_MODEL_NAME,
+    HTTP_400_BAD_REQUEST,
+    HTTP_404_NOT_FOUND,
+    HTTP_429_TOO_MANY_REQUESTS
+)
+from typing import AsyncIterator, List, Optional
+import asyncio
+import json
+import re
 import uuid
 
 router = APIRouter()
 logger = get_logger()
+config = load_config()
+model_config = config.get("model", {})
+model_name = model_config.get("name", DEFAULT_MODEL_NAME)
+model_revision = model_config.get("revision", "main")
+cache_config = config.get("cache", {})
+worker_config = config.get("worker", {})
+api_config = config.get("api", {})
+startup_config = config.get("startup", {})
+
+# Every model that can be requested by name; the `model` section is the default
+models_config = config.get("models", {})
+tracker_config = config.get("tracker", {})
+model_configs = {
+    model_name: model_config,
+    **{name: settings or {} for name, settings in models_config.get("registry", {}).items()}
+}
 
 # Service instances
-cache_service = CacheService()
-request_tracker = RequestTracker()
+request_tracker = RequestTracker(
+    max_size=tracker_config.get("max_size", 10000),
+    ttl=tracker_config.get("ttl", 600)
+)
 metrics_service = MetricsService()
-worker_service = WorkerService(cache_service, request_tracker)
+
+def _model_cache_config(name: str, dimension: int) -> dict:
+    """Cache settings for one model: its vector size and its own shared-memory table"""
+    shared_config = cache_config.get("shared_memory", {})
+    path = shared_config.get("path", "/dev/shm/embedding_service_cache")
+    if name != model_name:
+        path = f"{path}.{re.sub(r'[^A-Za-z0-9._-]+', '_', name)}"
+    return {
+        **cache_config,
+        "embedding_dim": dimension,
+        "shared_memory": {**shared_config, "path": path}
+    }
+
+def _remote_engine(name: str, backend: InferenceBackend) -> Optional[RemoteInferenceEngine]:
+    """Engine forwarding to the shared inference process, when it serves this model"""
+    client = get_remote_client()
+    if client is None or client.model_name != name:
+        return None
+    return RemoteInferenceEngine(
+        client, backend, max_batch_size=worker_config.get("max_encode_batch_size", 64)
+    )
+
+def _build_worker(name: str, settings: dict, backend: InferenceBackend) -> WorkerService:
+    # Backends produce slightly different vectors, so each gets its own cache entries.
+    # The revision is part of every key: the shared-memory L1 outlives restarts too.
+    cache_namespace = f"{name}:{backend.name}@{settings.get('revision', 'main')}"
+    cache_service = CacheService(
+        backend=create_cache_backend(_model_cache_config(name, backend.dimension)),
+        namespace=cache_namespace,
+        l2=create_l2_backend(cache_config, cache_namespace)
+    )
+    return WorkerService(
+        cache_service,
+        request_tracker,
+        backend,
+        batch_size=worker_config.get("batch_size", 10),
+        max_wait_ms=worker_config.get("max_wait_ms", 5),
+        max_queue_size=worker_config.get("max_queue_size", 1000),
+        aging_rate=worker_config.get("aging_rate", 1.0),
+        priority_weights={
+            Priority(priority): weight
+            for priority, weight in worker_config.get("priority_weights", {}).items()
+        },
+        length_window=worker_config.get("length_window", 40),
+        max_bucket_delay_ms=worker_config.get("max_bucket_delay_ms", 100),
+        inference_concurrency=worker_config.get("inference_concurrency", 1),
+        max_encode_batch_size=worker_config.get("max_encode_batch_size", 64),
+        prefetch_batches=worker_config.get("prefetch_batches", 2),
+        chunk_overlap_tokens=worker_config.get("chunk_overlap_tokens", 64),
+        engine=_remote_engine(name, backend)
+    )
+
+model_registry = ModelRegistry(
+    model_configs,
+    model_name,
+    _build_worker,
+    memory_budget_mb=models_config.get("memory_budget_mb", 0),
+    warmup_lengths=startup_config.get("warmup_lengths", [16, 128, 512]),
+    warmup_batch_size=startup_config.get("warmup_batch_size", 8)
+)
+
+def resolve_model(name: Optional[str]) -> str:
+    """Configured model name for a request, or a 404 for models not served here"""
+    try:
+        return model_registry.resolve(name)
+    except KeyError:
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND,
+            detail=f"Model '{name}' is not served here; available: {', '.join(model_configs)}"
+        )
 
 @router.post("/submit", response_model=EmbeddingResponse)
 async def submit_embedding(request: EmbeddingRequest):
+    name = resolve_model(request.model)
     request_id = str(uuid.uuid4())
-    
-    # Track the start of the request
-    await metrics_service.track_request_start(request_id, request.priority.value)
-    
-    # Check cache first
-    cached_result = await cache_service.get(request.text)
-    if cached_result:
-        await request_tracker.complete_request(request_id, cached_result, True)
-        await metrics_service.track_request_complete(request_id, True)
-        return EmbeddingResponse(request_id=request_id, status="completed")
-    
-    # Queue the request
-    await worker_service.queue_request(request_id, request)
+
+    async with model_registry.use(name) as worker:
+        _check_output_options(worker, request.dimensions, request.encoding)
+
+        # Track the start of the request
+        await metrics_service.track_request_start(request_id, request.priority.value)
+
+        # Check cache first; a chunked document is pooled from its chunks' entries when processed
+        cached_result = None
+        if request.long_text != "chunk":
+            cached_result = await worker.cache_service.get(request.text)
+        if cached_result is not None:
+            await request_tracker.complete_request(
+                request_id, cached_result, True, request.dimensions, request.encoding
+            )
+            await metrics_service.track_request_complete(request_id, True)
+            return EmbeddingResponse(request_id=request_id, status="completed")
+
+        # Queue the request
+        try:
+            await worker.queue_request(request_id, request)
+        except asyncio.QueueFull:
+            await metrics_service.track_request_failed(request_id, "queue_full")
+            raise HTTPException(status_code=HTTP_429_TOO_MANY_REQUESTS, detail="Request queue is full")
     return EmbeddingResponse(request_id=request_id)
 
 @router.get("/status/{request_id}", response_model=StatusResponse)
@@ -49,39 +174,207 @@ async def get_status(request_id: str):
     return status
 
 @router.get("/result/{request_id}", response_model=ResultResponse)
-async def get_result(request_id: str):
-    result = await request_tracker.get_result(request_id)
+async def get_result(request_id: str, http_request: Request):
+    result = await request_tracker.get_result_payload(request_id)
     if not result:
         raise HTTPException(status_code=404, detail="Result not found")
-    return result
+
+    # Results are tracked as full float vectors; the requested outputs are derived here
+    dimensions = result.pop("dimensions", None)
+    encoding = result.pop("encoding", "float32")
+    if result["embedding"] is not None:
+        result["embedding"] = apply_output_options(result["embedding"], dimensions, encoding)
+    return embedding_response(http_request, result, result["embedding"], [result["cache_hit"]])
+
+def _check_output_options(worker: WorkerService, dimensions: Optional[int], encoding: str):
+    error = validate_output_options(worker.engine.dimension, dimensions, encoding)
+    if error:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=error)
 
 @router.post("/embed_sync", response_model=SyncEmbeddingResponse)
-async def embed_sync(request: SyncEmbeddingRequest):
-    request_id = str(uuid.uuid4())
-    await metrics_service.track_request_start(request_id, "sync")
-    
-    try:
-        if request.use_cache:
-            cached_result = await cache_service.get(request.text)
-            if cached_result:
-                await metrics_service.track_request_complete(request_id, True)
-                return SyncEmbeddingResponse(
-                    embedding=cached_result,
-                    cache_hit=True
+async def embed_sync(request: SyncEmbeddingRequest, http_request: Request):
+    async with model_registry.use(resolve_model(request.model)) as worker:
+        _check_output_options(worker, request.dimensions, request.encoding)
+        request_id = str(uuid.uuid4())
+        await metrics_service.track_request_start(request_id, "sync")
+
+        try:
+            chunks = None
+            if request.long_text == "chunk":
+                embeddings, cache_hits, chunks = await worker.embed_documents(
+                    [request.text],
+                    pooling=request.pooling,
+                    return_chunks=request.return_chunks,
+                    use_cache=request.use_cache
                 )
-        
-        # Process immediately
-        embedding = await worker_service.process_text(request.text)
-        
-        # Cache the result
-        if request.use_cache:
-            await cache_service.set(request.text, embedding)
-        
-        await metrics_service.track_request_complete(request_id, False)
-        return SyncEmbeddingResponse(
-            embedding=embedding,
-            cache_hit=False
+                embedding, cache_hit = embeddings[0], cache_hits[0]
+            else:
+                embedding = await worker.cache_service.get(request.text) if request.use_cache else None
+                cache_hit = embedding is not None
+                if not cache_hit:
+                    # Process immediately
+                    embedding = await worker.process_text(request.text)
+
+                    # Cache the result
+                    if request.use_cache:
+                        await worker.cache_service.set(request.text, embedding)
+
+            # The cache holds full float vectors; requested outputs are derived from them
+            embedding = apply_output_options(embedding, request.dimensions, request.encoding)
+            payload = {"embedding": embedding, "cache_hit": cache_hit}
+            if chunks is not None:
+                payload["chunks"] = apply_output_options(chunks[0], request.dimensions, request.encoding)
+
+            await metrics_service.track_request_complete(request_id, cache_hit)
+            return embedding_response(http_request, payload, embedding, [cache_hit])
+        except HTTPException:
+            raise
+        except InputTooLargeError as e:
+            await metrics_service.track_request_failed(request_id, "input_too_large")
+            raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
+        except Exception as e:
+            await metrics_service.track_request_failed(request_id)
+            raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/embed_batch", response_model=BatchEmbeddingResponse)
+async def embed_batch(request: BatchEmbeddingRequest, http_request: Request):
+    max_batch_size = api_config.get("max_batch_size", 256)
+    if len(request.texts) > max_batch_size:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail=f"Batch contains {len(request.texts)} texts; the limit is {max_batch_size}"
         )
-    except Exception as e:
-        await metrics_service.track_request_failed(request_id)
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+    async with model_registry.use(resolve_model(request.model)) as worker:
+        _check_output_options(worker, request.dimensions, request.encoding)
+        request_id = str(uuid.uuid4())
+        await metrics_service.track_request_start(request_id, "batch")
+
+        try:
+            chunks = None
+            if request.long_text == "chunk":
+                embeddings, cache_hits, chunks = await worker.embed_documents(
+                    request.texts,
+                    pooling=request.pooling,
+                    return_chunks=request.return_chunks,
+                    use_cache=request.use_cache
+                )
+            else:
+                embeddings, cache_hits = await worker.embed_many(
+                    request.texts, use_cache=request.use_cache
+                )
+            await metrics_service.track_request_complete(request_id, all(cache_hits))
+
+            embeddings = apply_output_options(embeddings, request.dimensions, request.encoding)
+            items = [
+                {"index": i, "embedding": embedding, "cache_hit": cache_hit}
+                for i, (embedding, cache_hit) in enumerate(zip(embeddings, cache_hits))
+            ]
+            if chunks is not None:
+                for item, doc_chunks in zip(items, chunks):
+                    item["chunks"] = apply_output_options(doc_chunks, request.dimensions, request.encoding)
+            payload = {
+                "embeddings": items,
+                "unique_texts": len(set(request.texts)),
+                "cache_hits": sum(cache_hits)
+            }
+            return embedding_response(http_request, payload, embeddings, cache_hits)
+        except HTTPException:
+            raise
+        except InputTooLargeError as e:
+            await metrics_service.track_request_failed(request_id, "input_too_large")
+            raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
+        except Exception as e:
+            await metrics_service.track_request_failed(request_id)
+            raise HTTPException(status_code=500, detail=str(e))
+
+def _parse_stream_record(line: bytes, line_number: int, max_text_length: int) -> dict:
+    """Parse one NDJSON input line into an {"id", "text"} or {"id", "error"} record"""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return {"id": None, "error": f"Line {line_number} is not valid JSON"}
+    if not isinstance(record, dict):
+        return {"id": None, "error": f"Line {line_number} is not a JSON object"}
+
+    record_id = record.get("id", line_number)
+    text = record.get("text")
+    if not isinstance(text, str):
+        return {"id": record_id, "error": "Record has no 'text' string"}
+    if len(text) > max_text_length:
+        return {"id": record_id, "error": f"Text exceeds {max_text_length} characters"}
+    return {"id": record_id, "text": text}
+
+async def _embed_stream_batch(
+    worker: WorkerService,
+    records: List[dict],
+    dimensions: Optional[int],
+    encoding: str
+) -> bytes:
+    valid = [record for record in records if "text" in record]
+    if valid:
+        embeddings, cache_hits = await worker.embed_many([record["text"] for record in valid])
+        embeddings = apply_output_options(embeddings, dimensions, encoding)
+        for record, embedding, cache_hit in zip(valid, embeddings, cache_hits):
+            record["embedding"] = embedding
+            record["cache_hit"] = cache_hit
+            del record["text"]
+    return b"".join(encode_json(record) + b"\n" for record in records)
+
+@router.post("/embed_stream")
+async def embed_stream(
+    http_request: Request,
+    model: Optional[str] = None,
+    dimensions: Optional[int] = None,
+    encoding: EmbeddingEncoding = "float32"
+):
+    """Embed newline-delimited {"id", "text"} records and stream NDJSON results.
+
+    Records are embedded in batches as they arrive and each batch is written
+    out before more of the body is read, so memory stays bounded no matter
+    how large the upload is. `model`, `dimensions` and `encoding` query
+    parameters apply to every record.
+    """
+    name = resolve_model(model)
+    worker = await model_registry.get(name)
+    _check_output_options(worker, dimensions, encoding)
+    batch_size = worker.engine.max_batch_size
+    max_text_length = api_config.get("max_text_length", 10000)
+    # Longest acceptable line: a maximal text with every character escaped, plus the id
+    max_line_bytes = max_text_length * 12 + 1024
+
+    request_id = str(uuid.uuid4())
+    await metrics_service.track_request_start(request_id, "stream")
+
+    async def generate() -> AsyncIterator[bytes]:
+        buffer = b""
+        line_number = 0
+        batch: List[dict] = []
+        try:
+            async with model_registry.use(name) as worker:
+                async for chunk in http_request.stream():
+                    buffer += chunk
+                    *lines, buffer = buffer.split(b"\n")
+                    if len(buffer) > max_line_bytes:
+                        await metrics_service.track_request_failed(request_id, "line_too_long")
+                        yield encode_json({"id": None, "error": f"Line {line_number + 1} is too long"}) + b"\n"
+                        return
+
+                    for line in lines:
+                        line_number += 1
+                        if line.strip():
+                            batch.append(_parse_stream_record(line, line_number, max_text_length))
+                        if len(batch) >= batch_size:
+                            yield await _embed_stream_batch(worker, batch, dimensions, encoding)
+                            batch = []
+
+                if buffer.strip():
+                    batch.append(_parse_stream_record(buffer, line_number + 1, max_text_length))
+                if batch:
+                    yield await _embed_stream_batch(worker, batch, dimensions, encoding)
+            await metrics_service.track_request_complete(request_id, False)
+        except Exception as e:
+            await metrics_service.track_request_failed(request_id)
+            logger.error(f"Streaming request {request_id} failed: {str(e)}")
+            yield encode_json({"id": None, "error": str(e)}) + b"\n"
+
+    return DuplexStreamingResponse(generate(), media_type=NDJSON_MEDIA_TYPE)
\ No newline at end of file
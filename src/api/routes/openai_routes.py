@@ -0,0 +1,68 @@
+from fastapi import APIRouter, HTTPException
+from src.models.pydantic_models import (
+    OpenAIEmbeddingRequest,
+    OpenAIEmbeddingData,
+    OpenAIEmbeddingResponse,
+    OpenAIUsage
+)
+from src.services.quantization import truncate_dimensions, validate_output_options
+from src.services.remote_inference import InputTooLargeError
+from src.api.routes.embedding_routes import api_config, metrics_service, model_registry, resolve_model
+from src.utils.constants import HTTP_400_BAD_REQUEST
+import base64
+import numpy as np
+import uuid
+
+router = APIRouter(prefix="/v1")
+
+@router.post("/embeddings", response_model=OpenAIEmbeddingResponse)
+async def create_embeddings(request: OpenAIEmbeddingRequest):
+    """OpenAI-compatible embeddings endpoint"""
+    texts = [request.input] if isinstance(request.input, str) else request.input
+    if not texts:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="input must not be empty")
+
+    max_batch_size = api_config.get("max_batch_size", 256)
+    if len(texts) > max_batch_size:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail=f"input contains {len(texts)} texts; the limit is {max_batch_size}"
+        )
+    model_name = resolve_model(request.model)
+
+    async with model_registry.use(model_name) as worker:
+        error = validate_output_options(worker.engine.dimension, request.dimensions, "float32")
+        if error:
+            raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=error)
+
+        request_id = str(uuid.uuid4())
+        await metrics_service.track_request_start(request_id, "openai")
+
+        try:
+            embeddings, cache_hits = await worker.embed_many(texts)
+            token_counts = await worker.engine.count_tokens(texts)
+            embeddings = truncate_dimensions(embeddings, request.dimensions)
+
+            if request.encoding_format == "base64":
+                # Little-endian float32, as the OpenAI SDK decodes it
+                raw = np.ascontiguousarray(embeddings, dtype="<f4")
+                values = [base64.b64encode(row.tobytes()).decode("ascii") for row in raw]
+            else:
+                values = embeddings.tolist()
+
+            await metrics_service.track_request_complete(request_id, all(cache_hits))
+            prompt_tokens = sum(token_counts)
+            return OpenAIEmbeddingResponse(
+                data=[
+                    OpenAIEmbeddingData(index=i, embedding=value)
+                    for i, value in enumerate(values)
+                ],
+                model=model_name,
+                usage=OpenAIUsage(prompt_tokens=prompt_tokens, total_tokens=prompt_tokens)
+            )
+        except InputTooLargeError as e:
+            await metrics_service.track_request_failed(request_id, "input_too_large")
+            raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
+        except Exception as e:
+            await metrics_service.track_request_failed(request_id)
+            raise HTTPException(status_code=500, detail=str(e))
@@ -1,7 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
 from src.services.worker import WorkerService
 from src.services.cache_service import CacheService
 from src.services.metrics_service import MetricsService
+from src.api.routes.embedding_routes import model_registry, request_tracker
 
 router = APIRouter()
 
@@ -12,10 +14,20 @@ async def health_check():
         "version": "1.0.0"
     }
 
+@router.get("/ready")
+async def readiness_check(request: Request):
+    """503 until the default model is loaded and warmed up; point load balancers here"""
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ready", "startup": request.app.state.startup}
+
 @router.get("/system-status")
-async def system_status():
+async def system_status(request: Request):
     metrics = await MetricsService().get_metrics()
     return {
         "status": "operational",
-        **metrics
+        **metrics,
+        "startup": getattr(request.app.state, "startup", None),
+        "models": model_registry.stats(),
+        "tracker": request_tracker.stats()
     }
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Union
+from typing import Optional, List, Literal, Union
 from enum import Enum
 
 class Priority(str, Enum):
@@ -7,9 +7,19 @@ class Priority(str, Enum):
     MEDIUM = "medium"
     HIGH = "high"
 
+# Embedding values: floats for float32, signed bytes for int8, packed bits for ubinary
+EmbeddingValues = Union[List[float], List[int]]
+
+EmbeddingEncoding = Literal["float32", "int8", "ubinary"]
+
 class EmbeddingRequest(BaseModel):
     text: str
     priority: Priority = Field(default=Priority.MEDIUM)
+    model: Optional[str] = None
+    long_text: Literal["truncate", "chunk"] = "truncate"
+    pooling: Literal["mean", "weighted"] = "weighted"
+    dimensions: Optional[int] = Field(default=None, ge=1)
+    encoding: EmbeddingEncoding = "float32"
 
 class EmbeddingResponse(BaseModel):
     request_id: str
@@ -24,14 +34,64 @@ class StatusResponse(BaseModel):
 
 class ResultResponse(BaseModel):
     request_id: str
-    embedding: Optional[List[float]] = None
+    embedding: Optional[EmbeddingValues] = None
     cache_hit: bool = False
     error: Optional[str] = None
 
 class SyncEmbeddingRequest(BaseModel):
     text: str
+    model: Optional[str] = None
     use_cache: bool = True
+    long_text: Literal["truncate", "chunk"] = "truncate"
+    pooling: Literal["mean", "weighted"] = "weighted"
+    return_chunks: bool = False
+    dimensions: Optional[int] = Field(default=None, ge=1)
+    encoding: EmbeddingEncoding = "float32"
 
 class SyncEmbeddingResponse(BaseModel):
-    embedding: List[float]
-    cache_hit: bool = False
\ No newline at end of file
+    embedding: EmbeddingValues
+    cache_hit: bool = False
+    chunks: Optional[List[EmbeddingValues]] = None
+
+class BatchEmbeddingRequest(BaseModel):
+    texts: List[str] = Field(..., min_length=1)
+    model: Optional[str] = None
+    use_cache: bool = True
+    long_text: Literal["truncate", "chunk"] = "truncate"
+    pooling: Literal["mean", "weighted"] = "weighted"
+    return_chunks: bool = False
+    dimensions: Optional[int] = Field(default=None, ge=1)
+    encoding: EmbeddingEncoding = "float32"
+
+class BatchEmbeddingItem(BaseModel):
+    index: int
+    embedding: EmbeddingValues
+    cache_hit: bool = False
+    chunks: Optional[List[EmbeddingValues]] = None
+
+class BatchEmbeddingResponse(BaseModel):
+    embeddings: List[BatchEmbeddingItem]
+    unique_texts: int
+    cache_hits: int
+
+class OpenAIEmbeddingRequest(BaseModel):
+    input: Union[str, List[str]]
+    model: Optional[str] = None
+    encoding_format: Literal["float", "base64"] = "float"
+    dimensions: Optional[int] = Field(default=None, ge=1)
+    user: Optional[str] = None
+
+class OpenAIEmbeddingData(BaseModel):
+    object: str = "embedding"
+    index: int
+    embedding: Union[List[float], str]
+
+class OpenAIUsage(BaseModel):
+    prompt_tokens: int
+    total_tokens: int
+
+class OpenAIEmbeddingResponse(BaseModel):
+    object: str = "list"
+    data: List[OpenAIEmbeddingData]
+    model: str
+    usage: OpenAIUsage
\ No newline at end of file
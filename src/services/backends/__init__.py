@@ -0,0 +1,60 @@
+from typing import Dict, Tuple
+from src.services.backends.base import InferenceBackend
+from src.services.backends.fake import FakeBackend
+from src.utils.constants import DEFAULT_MODEL_NAME
+
+BACKEND_NAMES = ("torch", "onnx", "onnx-int8", "fake")
+
+# Backends loaded before the server forked its workers; their weights are
+# shared copy-on-write, so workers reuse them instead of loading their own
+_preloaded: Dict[Tuple[str, str], InferenceBackend] = {}
+
+def _backend_key(model_config: dict) -> Tuple[str, str]:
+    return model_config.get("backend", "torch"), model_config.get("name", DEFAULT_MODEL_NAME)
+
+def preload_inference_backend(model_config: dict) -> InferenceBackend:
+    """Build a backend now and hand the same instance to later create_inference_backend calls"""
+    backend = create_inference_backend(model_config)
+    _preloaded[_backend_key(model_config)] = backend
+    return backend
+
+def create_inference_backend(model_config: dict) -> InferenceBackend:
+    """Build the inference backend selected by the `model` config section.
+
+    The torch and onnx modules are imported here rather than at package
+    import, so the app can start without paying for a runtime it does not use.
+    """
+    backend, model_name = _backend_key(model_config)
+    if (backend, model_name) in _preloaded:
+        return _preloaded[(backend, model_name)]
+
+    if backend == "torch":
+        from src.services.backends.torch_backend import TorchBackend
+
+        return TorchBackend(model_name)
+    if backend in ("onnx", "onnx-int8"):
+        from src.services.backends.onnx_backend import OnnxBackend
+
+        onnx_config = model_config.get("onnx", {})
+        return OnnxBackend(
+            model_name,
+            quantize=backend == "onnx-int8",
+            cache_dir=onnx_config.get("cache_dir", "data/onnx"),
+            threads=onnx_config.get("threads", 0)
+        )
+    if backend == "fake":
+        fake_config = model_config.get("fake", {})
+        return FakeBackend(
+            model_name,
+            dimension=fake_config.get("dimension", 1024),
+            max_seq_length=fake_config.get("max_seq_length", 512)
+        )
+    raise ValueError(f"Unknown inference backend: {backend}")
+
+__all__ = [
+    "BACKEND_NAMES",
+    "FakeBackend",
+    "InferenceBackend",
+    "create_inference_backend",
+    "preload_inference_backend"
+]
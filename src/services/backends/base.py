@@ -0,0 +1,43 @@
+from abc import ABC, abstractmethod
+from typing import Any, List
+import numpy as np
+
+class InferenceBackend(ABC):
+    """Model runtime split into the tokenize and forward stages the inference engine pipelines.
+
+    `tokenizer` must behave like a Hugging Face fast tokenizer: it is called
+    directly to count tokens and to split long texts by offset mapping.
+    forward() may be called from several threads at once.
+    """
+
+    name: str = "base"
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.tokenizer = None
+
+    @property
+    @abstractmethod
+    def dimension(self) -> int:
+        """Size of the embeddings forward() returns"""
+
+    @property
+    @abstractmethod
+    def max_seq_length(self) -> int:
+        """Tokens per text the model sees; longer texts are truncated"""
+
+    @property
+    def memory_bytes(self) -> int:
+        """Estimated resident size of the loaded model, used for memory-budgeted eviction"""
+        return 0
+
+    @abstractmethod
+    def tokenize(self, texts: List[str]) -> Any:
+        """Turn a batch of texts into the model inputs forward() expects"""
+
+    @abstractmethod
+    def forward(self, features: Any) -> np.ndarray:
+        """Run the model on tokenized inputs and return a float32 (batch, dimension) array"""
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.forward(self.tokenize(texts))
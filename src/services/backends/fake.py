@@ -0,0 +1,96 @@
+from typing import List
+import hashlib
+import re
+import zlib
+import numpy as np
+
+from src.services.backends.base import InferenceBackend
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_CLS_ID = 101
+_SEP_ID = 102
+
+class FakeTokenizer:
+    """Word-level stand-in for a Hugging Face fast tokenizer.
+
+    Supports the call signature the service relies on: special tokens,
+    truncation to max_length and offset mappings.
+    """
+
+    def __init__(self, vocab_size: int = 30000):
+        self.vocab_size = vocab_size
+
+    def __call__(
+        self,
+        texts,
+        add_special_tokens: bool = True,
+        truncation: bool = False,
+        max_length: int = None,
+        return_offsets_mapping: bool = False,
+        **kwargs
+    ) -> dict:
+        if isinstance(texts, str):
+            texts = [texts]
+
+        input_ids = []
+        offset_mapping = []
+        for text in texts:
+            spans = [match.span() for match in _TOKEN_PATTERN.finditer(text)]
+            if truncation and max_length:
+                spans = spans[:max(0, max_length - (2 if add_special_tokens else 0))]
+            ids = [1000 + zlib.crc32(text[start:end].encode("utf-8")) % self.vocab_size for start, end in spans]
+            if add_special_tokens:
+                ids = [_CLS_ID] + ids + [_SEP_ID]
+                spans = [(0, 0)] + spans + [(0, 0)]
+            input_ids.append(ids)
+            offset_mapping.append(spans)
+
+        encoded = {"input_ids": input_ids}
+        if return_offsets_mapping:
+            encoded["offset_mapping"] = offset_mapping
+        return encoded
+
+class FakeBackend(InferenceBackend):
+    """Deterministic backend for tests and local development without model weights.
+
+    Each text maps to a fixed unit vector seeded from a hash of the text the
+    model would see after truncation, so equal inputs always give equal
+    embeddings and nothing is downloaded or loaded.
+    """
+
+    name = "fake"
+
+    def __init__(self, model_name: str = "fake", dimension: int = 1024, max_seq_length: int = 512):
+        super().__init__(model_name)
+        self._dimension = dimension
+        self._max_seq_length = max_seq_length
+        self.tokenizer = FakeTokenizer()
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    @property
+    def max_seq_length(self) -> int:
+        return self._max_seq_length
+
+    def tokenize(self, texts: List[str]) -> List[str]:
+        encoded = self.tokenizer(
+            texts,
+            add_special_tokens=False,
+            truncation=True,
+            max_length=self._max_seq_length - 2,
+            return_offsets_mapping=True
+        )
+        return [
+            text[:offsets[-1][1]] if offsets else ""
+            for text, offsets in zip(texts, encoded["offset_mapping"])
+        ]
+
+    def forward(self, features: List[str]) -> np.ndarray:
+        embeddings = np.empty((len(features), self._dimension), dtype=np.float32)
+        for row, text in enumerate(features):
+            seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+            embeddings[row] = np.random.default_rng(seed).standard_normal(self._dimension, dtype=np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings
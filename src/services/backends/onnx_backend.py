@@ -0,0 +1,219 @@
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+import fcntl
+import json
+import os
+import re
+import threading
+import numpy as np
+
+from src.services.backends.base import InferenceBackend
+from src.utils.cpu_topology import planned_threads
+from src.utils.logger import get_logger
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+_EXPORT_META = "export.json"
+_FP32_MODEL = "model.onnx"
+_INT8_MODEL = "model.int8.onnx"
+_LOCK_FILE = ".lock"
+
+def _slugify(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", model_name).strip("_") or "model"
+
+@contextmanager
+def _export_lock(export_dir: str) -> Iterator[None]:
+    """Hold an exclusive lock on the export directory across processes"""
+    os.makedirs(export_dir, exist_ok=True)
+    fd = os.open(os.path.join(export_dir, _LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
+
+def export_onnx(model_name: str, export_dir: str):
+    """Export the model's transformer to ONNX with dynamic batch and sequence axes.
+
+    Pooling and normalization are read from the SentenceTransformer pipeline
+    and recorded in export.json, so the exported graph only needs to produce
+    token embeddings. Needs torch and sentence-transformers; serving the
+    export afterwards only needs onnxruntime and transformers.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    logger = get_logger()
+    logger.info(f"Exporting {model_name} to ONNX in {export_dir}")
+    os.makedirs(export_dir, exist_ok=True)
+
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0]
+    pooling = next(module for module in model if type(module).__name__ == "Pooling")
+    hf_model = transformer.auto_model.eval()
+    tokenizer = transformer.tokenizer
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+
+    class _TokenEmbeddings(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.model = hf_model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+    model_path = os.path.join(export_dir, _FP32_MODEL)
+    with torch.inference_mode():
+        torch.onnx.export(
+            _TokenEmbeddings(),
+            tuple(sample[name] for name in input_names),
+            f"{model_path}.tmp",
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=17
+        )
+    os.replace(f"{model_path}.tmp", model_path)
+    tokenizer.save_pretrained(export_dir)
+
+    # Written last: its presence marks a complete export
+    meta_path = os.path.join(export_dir, _EXPORT_META)
+    with open(f"{meta_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump({
+            "model": model_name,
+            "pooling": "cls" if pooling.pooling_mode_cls_token else "mean",
+            "normalize": any(type(module).__name__ == "Normalize" for module in model),
+            "dimension": model.get_sentence_embedding_dimension(),
+            "max_seq_length": model.max_seq_length,
+            "input_names": input_names
+        }, f, indent=2)
+    os.replace(f"{meta_path}.tmp", meta_path)
+
+class OnnxBackend(InferenceBackend):
+    """Runs an ONNX export of the model on ONNX Runtime's CPU provider.
+
+    The model is exported once into cache_dir and reused afterwards.
+    Processes that start together take a file lock in the export directory,
+    so one of them exports or quantizes while the others wait and then
+    reuse its files; each file is written under a temporary name and
+    renamed into place, so a partly written graph is never loaded. With
+    quantize=True the export is also dynamically quantized to int8 weights,
+    which is usually several times faster on CPU at a small accuracy cost;
+    compare_backends.py measures that drift against the torch backend.
+    threads sets ONNX Runtime's intra-op thread count. With 0 the session
+    uses the per-process thread count from the server's CPU plan, and only
+    without a plan lets ONNX Runtime use every core.
+
+    The InferenceSession is built on the first forward pass rather than
+    here, because a session starts its thread pool when it is built and
+    those threads do not survive a fork. A backend preloaded in the
+    pre-fork parent therefore builds one session per process that runs
+    the model; tokenizer-only processes never build one.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        quantize: bool = False,
+        cache_dir: str = "data/onnx",
+        threads: int = 0
+    ):
+        if ort is None:
+            raise ImportError(
+                "The onnx backends require the 'onnxruntime' package (pip install onnxruntime)"
+            )
+        from transformers import AutoTokenizer
+
+        super().__init__(model_name)
+        self.name = "onnx-int8" if quantize else "onnx"
+        self.logger = get_logger()
+
+        export_dir = os.path.join(cache_dir, _slugify(model_name))
+        meta_path = os.path.join(export_dir, _EXPORT_META)
+        model_path = os.path.join(export_dir, _INT8_MODEL if quantize else _FP32_MODEL)
+        if not (os.path.exists(meta_path) and os.path.exists(model_path)):
+            with _export_lock(export_dir):
+                # Another process may have finished the work while this one waited
+                if not os.path.exists(meta_path):
+                    export_onnx(model_name, export_dir)
+                if quantize and not os.path.exists(model_path):
+                    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+                    self.logger.info(f"Quantizing {model_name} to int8")
+                    quantize_dynamic(
+                        os.path.join(export_dir, _FP32_MODEL), f"{model_path}.tmp", weight_type=QuantType.QInt8
+                    )
+                    os.replace(f"{model_path}.tmp", model_path)
+
+        with open(meta_path, encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        self.model_path = model_path
+        self.threads = threads
+        self.tokenizer = AutoTokenizer.from_pretrained(export_dir)
+        # Exports made before input_names was recorded take the tokenizer's
+        self.input_names = self.meta.get("input_names") or [
+            name for name in ("input_ids", "attention_mask", "token_type_ids")
+            if name in self.tokenizer.model_input_names
+        ]
+        self._session = None
+        self._session_lock = threading.Lock()
+        self.logger.info(f"Loaded {model_path} for ONNX Runtime")
+
+    @property
+    def session(self) -> "ort.InferenceSession":
+        """The ONNX Runtime session for this process, built on first use"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    options = ort.SessionOptions()
+                    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                    threads = self.threads or planned_threads()
+                    if threads:
+                        options.intra_op_num_threads = threads
+                    self._session = ort.InferenceSession(
+                        self.model_path, options, providers=["CPUExecutionProvider"]
+                    )
+                    self.logger.info(f"Started ONNX Runtime session for {self.model_path} in process {os.getpid()}")
+        return self._session
+
+    @property
+    def dimension(self) -> int:
+        return self.meta["dimension"]
+
+    @property
+    def max_seq_length(self) -> int:
+        return self.meta["max_seq_length"]
+
+    @property
+    def memory_bytes(self) -> int:
+        # Weights dominate; ONNX Runtime holds roughly one copy of the graph file
+        return os.path.getsize(self.model_path)
+
+    def tokenize(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="np"
+        )
+        return {name: encoded[name].astype(np.int64) for name in self.input_names}
+
+    def forward(self, features: Dict[str, np.ndarray]) -> np.ndarray:
+        hidden = self.session.run(None, features)[0]
+        if self.meta["pooling"] == "cls":
+            embeddings = hidden[:, 0]
+        else:
+            mask = features["attention_mask"][..., None].astype(np.float32)
+            embeddings = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        if self.meta["normalize"]:
+            embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
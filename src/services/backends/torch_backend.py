@@ -0,0 +1,51 @@
+from typing import Any, List
+import numpy as np
+
+from src.services.backends.base import InferenceBackend
+
+try:
+    import torch
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    torch = None
+    SentenceTransformer = None
+
+class TorchBackend(InferenceBackend):
+    """Reference backend: the SentenceTransformer model running on PyTorch"""
+
+    name = "torch"
+
+    def __init__(self, model_name: str, device: str = None):
+        if SentenceTransformer is None:
+            raise ImportError(
+                "The torch backend requires the 'sentence-transformers' package"
+            )
+        super().__init__(model_name)
+        self.model = SentenceTransformer(model_name, device=device)
+        self.model.eval()
+        self.tokenizer = self.model.tokenizer
+
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    @property
+    def max_seq_length(self) -> int:
+        return self.model.max_seq_length
+
+    @property
+    def memory_bytes(self) -> int:
+        tensors = list(self.model.parameters()) + list(self.model.buffers())
+        return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+    def tokenize(self, texts: List[str]) -> Any:
+        return self.model.tokenize(texts)
+
+    def forward(self, features: Any) -> np.ndarray:
+        features = {
+            name: value.to(self.model.device) if isinstance(value, torch.Tensor) else value
+            for name, value in features.items()
+        }
+        with torch.inference_mode():
+            embeddings = self.model(features)["sentence_embedding"]
+        return embeddings.float().cpu().numpy()
@@ -0,0 +1,121 @@
+from typing import List
+import glob
+import json
+import os
+import time
+import numpy as np
+
+from src.services.backends import create_inference_backend
+from src.services.inference_engine import InferenceEngine
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+def _write_json_atomic(path: str, data: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def _collect_files(input_dir: str, pattern: str) -> List[str]:
+    """Matching files ordered by size, so each batch holds texts of similar length"""
+    paths = [
+        path for path in glob.glob(os.path.join(input_dir, "**", pattern), recursive=True)
+        if os.path.isfile(path)
+    ]
+    return sorted(paths, key=lambda path: (os.path.getsize(path), path))
+
+def embed_files(
+    input_dir: str,
+    output_prefix: str,
+    model_name: str,
+    pattern: str = "*.txt",
+    batch_size: int = 32,
+    resume: bool = True,
+    backend: str = "torch"
+) -> str:
+    """Embed every matching file under input_dir into a memory-mapped float32 matrix.
+
+    Writes `<output_prefix>.npy` (one row per file), `<output_prefix>.ids.txt`
+    (the file path for each row, relative to input_dir) and
+    `<output_prefix>.progress.json`. Progress is only advanced after the rows
+    of a batch have been flushed, so an interrupted run can resume from the
+    last completed batch. Returns the path of the .npy file.
+    """
+    matrix_path = f"{output_prefix}.npy"
+    manifest_path = f"{output_prefix}.ids.txt"
+    progress_path = f"{output_prefix}.progress.json"
+
+    files = _collect_files(input_dir, pattern)
+    ids = [os.path.relpath(path, input_dir) for path in files]
+    if not files:
+        raise FileNotFoundError(f"No files matching {pattern} under {input_dir}")
+
+    completed = 0
+    if resume and os.path.exists(progress_path) and os.path.exists(matrix_path):
+        with open(progress_path, encoding="utf-8") as f:
+            progress = json.load(f)
+        with open(manifest_path, encoding="utf-8") as f:
+            previous_ids = f.read().splitlines()
+        if (
+            previous_ids != ids
+            or progress.get("model") != model_name
+            or progress.get("backend", "torch") != backend
+        ):
+            raise ValueError(
+                f"{output_prefix} was written for a different file set or model; "
+                "use another output prefix or disable resume"
+            )
+        completed = progress["completed"]
+        logger.info(f"Resuming {matrix_path} at {completed}/{len(files)}")
+
+    engine = InferenceEngine(
+        create_inference_backend({"name": model_name, "backend": backend}),
+        max_batch_size=batch_size
+    )
+    try:
+        if completed:
+            matrix = np.load(matrix_path, mmap_mode="r+")
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(matrix_path)), exist_ok=True)
+            matrix = np.lib.format.open_memmap(
+                matrix_path, mode="w+", dtype=np.float32, shape=(len(files), engine.dimension)
+            )
+            with open(manifest_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(ids) + "\n")
+            _write_json_atomic(progress_path, {
+                "model": model_name,
+                "backend": backend,
+                "total": len(files),
+                "completed": 0
+            })
+
+        start_time = time.time()
+        resumed_from = completed
+        for start in range(completed, len(files), batch_size):
+            batch_paths = files[start:start + batch_size]
+            texts = []
+            for path in batch_paths:
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    texts.append(f.read().strip())
+
+            matrix[start:start + len(texts)] = engine.encode_blocking(texts)
+            matrix.flush()
+
+            completed = start + len(texts)
+            _write_json_atomic(progress_path, {
+                "model": model_name,
+                "backend": backend,
+                "total": len(files),
+                "completed": completed
+            })
+
+            elapsed = time.time() - start_time
+            logger.info(
+                f"Embedded {completed}/{len(files)} files "
+                f"({(completed - resumed_from) / max(elapsed, 1e-9):.1f} files/s)"
+            )
+    finally:
+        engine.shutdown()
+
+    return matrix_path
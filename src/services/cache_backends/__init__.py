@@ -0,0 +1,59 @@
+from typing import Optional
+from src.services.cache_backends.base import CacheBackend
+from src.services.cache_backends.disk import DiskCacheBackend
+from src.services.cache_backends.memory import MemoryCacheBackend
+from src.services.cache_backends.redis_backend import RedisCacheBackend
+from src.services.cache_backends.shared_memory import SharedMemoryCacheBackend
+
+def create_cache_backend(cache_config: dict) -> CacheBackend:
+    """Build the cache backend selected by the `cache` config section"""
+    backend = cache_config.get("backend", "memory")
+    max_size = cache_config.get("max_size", 1000)
+    ttl = cache_config.get("ttl", 3600)
+    dtype = cache_config.get("dtype", "float32")
+
+    if backend == "memory":
+        return MemoryCacheBackend(max_size=max_size, ttl=ttl, dtype=dtype)
+    if backend == "shared_memory":
+        shared_config = cache_config.get("shared_memory", {})
+        return SharedMemoryCacheBackend(
+            path=shared_config.get("path", "/dev/shm/embedding_service_cache"),
+            dim=cache_config.get("embedding_dim", 1024),
+            max_size=max_size,
+            ttl=ttl,
+            dtype=dtype,
+            ways=shared_config.get("ways", 8)
+        )
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+def create_l2_backend(cache_config: dict, namespace: str) -> Optional[CacheBackend]:
+    """Build the L2 tier from `cache.redis` or `cache.disk`, or None when both are disabled"""
+    redis_config = cache_config.get("redis", {})
+    if redis_config.get("enabled", False):
+        return RedisCacheBackend(
+            url=redis_config.get("url", "redis://localhost:6379/0"),
+            ttl=redis_config.get("ttl", cache_config.get("ttl", 3600)),
+            namespace=namespace
+        )
+
+    disk_config = cache_config.get("disk", {})
+    if not disk_config.get("enabled", False):
+        return None
+    return DiskCacheBackend(
+        directory=disk_config.get("directory", "data/embedding_cache"),
+        namespace=namespace,
+        max_entries=disk_config.get("max_entries", 1_000_000),
+        ttl=disk_config.get("ttl", 0),
+        dtype=cache_config.get("dtype", "float32"),
+        compact_every=disk_config.get("compact_every", 1000)
+    )
+
+__all__ = [
+    "CacheBackend",
+    "DiskCacheBackend",
+    "MemoryCacheBackend",
+    "RedisCacheBackend",
+    "SharedMemoryCacheBackend",
+    "create_cache_backend",
+    "create_l2_backend"
+]
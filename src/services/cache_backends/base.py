@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence
+import hashlib
+import numpy as np
+
+def key_digest(key: str) -> bytes:
+    """Return a fixed 16-byte digest of a cache key for compact binary storage"""
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+class CacheBackend(ABC):
+    """Storage tier for embeddings keyed by build_cache_key digests"""
+
+    name: str = "base"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[np.ndarray]:
+        """Return the float32 embedding stored under key, or None on a miss"""
+
+    @abstractmethod
+    async def set(self, key: str, embedding: np.ndarray):
+        """Store an embedding under key, evicting older entries if needed"""
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Look up several keys; backends with a network hop override this to batch it"""
+        return [await self.get(key) for key in keys]
+
+    async def set_many(self, keys: Sequence[str], embeddings: Sequence[np.ndarray]):
+        """Store several embeddings; backends with a network hop override this to batch it"""
+        for key, embedding in zip(keys, embeddings):
+            await self.set(key, embedding)
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Return size and hit/miss counters for this backend"""
+
+    async def close(self):
+        """Release any resources held by the backend"""
@@ -0,0 +1,204 @@
+from typing import List, Optional, Sequence
+import asyncio
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from src.services.cache_backends.base import CacheBackend, key_digest
+from src.utils.logger import get_logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    key BLOB PRIMARY KEY,
+    vector BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+"""
+
+def _slugify(namespace: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", namespace).strip("_") or "default"
+
+class DiskCacheBackend(CacheBackend):
+    """Persistent embedding cache stored in a SQLite file.
+
+    Intended as an L2 behind the in-memory cache: entries survive restarts
+    and redeploys, and are promoted into L1 as they are requested, so the hot
+    set comes back lazily instead of being preloaded. Each model namespace
+    gets its own database file, so changing the model name or revision
+    starts a fresh cache.
+
+    All SQLite access runs on one dedicated thread. Every `compact_every`
+    writes the table is trimmed to `max_entries` by least recent access,
+    expired rows are dropped and freed pages are returned to the filesystem.
+    """
+
+    name = "disk"
+
+    def __init__(
+        self,
+        directory: str = "data/embedding_cache",
+        namespace: str = "",
+        max_entries: int = 1_000_000,
+        ttl: int = 0,
+        dtype: str = "float32",
+        compact_every: int = 1000,
+        touch_batch: int = 256
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{_slugify(namespace)}.sqlite3")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.compact_every = max(1, compact_every)
+        self.touch_batch = touch_batch
+        self.logger = get_logger()
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="disk-cache")
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+        # The storage dtype is fixed when the file is created
+        row = self._connection.execute("SELECT value FROM meta WHERE name = 'dtype'").fetchone()
+        if row is None:
+            self._connection.execute("INSERT INTO meta VALUES ('dtype', ?)", (np.dtype(dtype).str,))
+            self._connection.commit()
+            self.dtype = np.dtype(dtype)
+        else:
+            self.dtype = np.dtype(row[0])
+
+        self._writes_since_compaction = 0
+        self._touched: List[tuple[float, bytes]] = []
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.logger.info(f"Opened persistent cache {self.path}")
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def _get_many(self, keys: List[bytes]) -> List[Optional[np.ndarray]]:
+        placeholders = ", ".join("?" * len(keys))
+        rows = self._connection.execute(
+            f"SELECT key, vector, created_at FROM entries WHERE key IN ({placeholders})", keys
+        ).fetchall()
+
+        now = time.time()
+        found = {}
+        for key, vector, created_at in rows:
+            if self.ttl and now - created_at > self.ttl:
+                continue
+            found[key] = np.frombuffer(vector, dtype=self.dtype).astype(np.float32)
+
+            # Access times are written back in batches rather than on every read
+            self._touched.append((now, key))
+
+        if len(self._touched) >= self.touch_batch:
+            self._flush_touched()
+        return [found.get(key) for key in keys]
+
+    def _set_many(self, keys: List[bytes], embeddings: Sequence[np.ndarray]):
+        now = time.time()
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+            [
+                (key, np.asarray(embedding, dtype=self.dtype).tobytes(), now, now)
+                for key, embedding in zip(keys, embeddings)
+            ]
+        )
+        self._connection.commit()
+
+        self._writes_since_compaction += len(keys)
+        if self._writes_since_compaction >= self.compact_every:
+            self._compact()
+
+    def _flush_touched(self):
+        self._connection.executemany(
+            "UPDATE entries SET accessed_at = ? WHERE key = ?", self._touched
+        )
+        self._connection.commit()
+        self._touched = []
+
+    def _compact(self):
+        self._writes_since_compaction = 0
+        if self._touched:
+            self._flush_touched()
+
+        removed = 0
+        if self.ttl:
+            removed += self._connection.execute(
+                "DELETE FROM entries WHERE created_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+
+        count = self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            evicted = self._connection.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY accessed_at LIMIT ?)",
+                (excess,)
+            ).rowcount
+            self.evictions += evicted
+            removed += evicted
+
+        self._connection.commit()
+        if removed:
+            self._connection.execute("PRAGMA incremental_vacuum")
+            self.logger.info(f"Compacted persistent cache {self.path}: removed {removed} entries")
+
+    async def get(self, key: str) -> Optional[np.ndarray]:
+        return (await self.get_many([key]))[0]
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[np.ndarray]]:
+        if not keys:
+            return []
+        embeddings = await self._run(self._get_many, [key_digest(key) for key in keys])
+        found = sum(embedding is not None for embedding in embeddings)
+        self.hits += found
+        self.misses += len(keys) - found
+        return embeddings
+
+    async def set(self, key: str, embedding: np.ndarray):
+        await self.set_many([key], [embedding])
+
+    async def set_many(self, keys: Sequence[str], embeddings: Sequence[np.ndarray]):
+        if not keys:
+            return
+        await self._run(self._set_many, [key_digest(key) for key in keys], embeddings)
+
+    async def compact(self):
+        await self._run(self._compact)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "max_size": self.max_entries,
+            "dtype": self.dtype.name,
+            "file_bytes": os.path.getsize(self.path),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    async def close(self):
+        await self._run(self._close)
+        self._executor.shutdown(wait=True)
+
+    def _close(self):
+        if self._touched:
+            self._flush_touched()
+        self._connection.close()
@@ -0,0 +1,140 @@
+from typing import Optional, List
+import time
+from collections import OrderedDict, deque
+import numpy as np
+
+from src.services.cache_backends.base import CacheBackend
+from src.utils.logger import get_logger
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU cache with a fixed time-to-live per entry.
+
+    Entries live in an OrderedDict kept in recency order, so lookups,
+    refreshes and evictions are all O(1). Expired entries are dropped lazily
+    on access and by a small amortized sweep on every insert.
+
+    Embeddings are stored in one preallocated (max_size, dim) slab of the
+    configured dtype and each entry only records its slot, so a float16 slab
+    holds a 1024-dim vector in 2 KB instead of ~32 KB of boxed Python floats.
+    """
+
+    name = "memory"
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        ttl: int = 3600,
+        sweep_batch: int = 16,
+        dtype: str = "float32"
+    ):
+        self.cache: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        self.max_size = max_size
+        self.ttl = ttl
+        self.sweep_batch = sweep_batch
+        self.dtype = np.dtype(dtype)
+        self.logger = get_logger()
+
+        # Allocated on the first insert, once the embedding dimension is known
+        self._slab: Optional[np.ndarray] = None
+        self._free_slots: List[int] = []
+
+        # Insertion-ordered (timestamp, key) pairs; with a fixed TTL this is
+        # also expiry order, which lets the sweep stop at the first live entry
+        self._expiry_queue: deque[tuple[float, str]] = deque()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, key: str) -> Optional[np.ndarray]:
+        entry = self.cache.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        slot, timestamp = entry
+        if time.time() - timestamp > self.ttl:
+            # Remove expired entry
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self.cache.move_to_end(key)
+        self.hits += 1
+        return self._slab[slot].astype(np.float32)
+
+    async def set(self, key: str, embedding: np.ndarray):
+        embedding = np.asarray(embedding)
+        if self._slab is None:
+            self._allocate(embedding.shape[-1])
+        elif embedding.shape[-1] != self._slab.shape[1]:
+            raise ValueError(
+                f"Embedding dimension {embedding.shape[-1]} does not match cache dimension {self._slab.shape[1]}"
+            )
+
+        now = time.time()
+        self._sweep_expired(now)
+
+        if key in self.cache:
+            slot, _ = self.cache.pop(key)
+        elif self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            _, (slot, _) = self.cache.popitem(last=False)
+            self.evictions += 1
+
+        self._slab[slot] = embedding
+        self.cache[key] = (slot, now)
+        self._expiry_queue.append((now, key))
+        if len(self._expiry_queue) > 2 * self.max_size:
+            self._compact_expiry_queue()
+
+    def _allocate(self, dim: int):
+        self._slab = np.empty((self.max_size, dim), dtype=self.dtype)
+        self._free_slots = list(range(self.max_size - 1, -1, -1))
+        self.logger.info(
+            f"Allocated cache slab of {self.max_size}x{dim} {self.dtype.name} "
+            f"({self._slab.nbytes / (1024 * 1024):.1f} MB)"
+        )
+
+    def _remove(self, key: str):
+        slot, _ = self.cache.pop(key)
+        self._free_slots.append(slot)
+
+    def _sweep_expired(self, now: float):
+        """Drop up to sweep_batch expired entries from the front of the expiry queue"""
+        for _ in range(self.sweep_batch):
+            if not self._expiry_queue:
+                return
+            timestamp, key = self._expiry_queue[0]
+            if now - timestamp <= self.ttl:
+                return
+            self._expiry_queue.popleft()
+
+            # Skip stale queue records for keys that were overwritten or evicted
+            entry = self.cache.get(key)
+            if entry is not None and entry[1] == timestamp:
+                self._remove(key)
+                self.expirations += 1
+
+    def _compact_expiry_queue(self):
+        """Rebuild the expiry queue from live entries once stale records pile up"""
+        self._expiry_queue = deque(
+            sorted((timestamp, key) for key, (_, timestamp) in self.cache.items())
+        )
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.cache),
+            "max_size": self.max_size,
+            "dtype": self.dtype.name,
+            "slab_bytes": self._slab.nbytes if self._slab is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,97 @@
+from typing import List, Optional, Sequence
+import numpy as np
+
+from src.services.cache_backends.base import CacheBackend
+from src.utils.logger import get_logger
+
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+class RedisCacheBackend(CacheBackend):
+    """Embedding cache on a Redis-protocol server shared by several hosts.
+
+    Values are raw little-endian float32 bytes rather than JSON. Batch
+    lookups use a single MGET and batch writes a single non-transactional
+    pipeline of SET ... EX, so a batch of texts costs one round trip instead
+    of one per text. Pass `client` to use an existing connection, e.g. a
+    fakeredis.aioredis.FakeRedis instance or a local redis-server in tests.
+
+    Keys are prefixed with `namespace` (model, backend and revision), so a
+    revision bump stops serving vectors written by the previous model
+    instead of waiting out their TTL.
+    """
+
+    name = "redis"
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        ttl: int = 3600,
+        client=None,
+        namespace: str = ""
+    ):
+        if client is None:
+            if redis is None:
+                raise ImportError(
+                    "The redis cache backend requires the 'redis' package (pip install redis)"
+                )
+            client = redis.from_url(url)
+        self.client = client
+        self.url = url
+        self.ttl = ttl
+        self.namespace = namespace
+        self.logger = get_logger()
+
+        self.hits = 0
+        self.misses = 0
+        self.round_trips = 0
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}|{key}" if self.namespace else key
+
+    @staticmethod
+    def _decode(value: Optional[bytes]) -> Optional[np.ndarray]:
+        if value is None:
+            return None
+        return np.frombuffer(value, dtype="<f4").astype(np.float32)
+
+    async def get(self, key: str) -> Optional[np.ndarray]:
+        return (await self.get_many([key]))[0]
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[np.ndarray]]:
+        if not keys:
+            return []
+        values = await self.client.mget([self._key(key) for key in keys])
+        self.round_trips += 1
+
+        embeddings = [self._decode(value) for value in values]
+        found = sum(embedding is not None for embedding in embeddings)
+        self.hits += found
+        self.misses += len(keys) - found
+        return embeddings
+
+    async def set(self, key: str, embedding: np.ndarray):
+        await self.set_many([key], [embedding])
+
+    async def set_many(self, keys: Sequence[str], embeddings: Sequence[np.ndarray]):
+        if not keys:
+            return
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, embedding in zip(keys, embeddings):
+                pipe.set(self._key(key), np.asarray(embedding, dtype="<f4").tobytes(), ex=self.ttl or None)
+            await pipe.execute()
+        self.round_trips += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "round_trips": self.round_trips,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    async def close(self):
+        await self.client.aclose()
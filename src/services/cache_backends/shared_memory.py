@@ -0,0 +1,198 @@
+from typing import Optional, Tuple
+import fcntl
+import mmap
+import os
+import struct
+import time
+import numpy as np
+
+from src.services.cache_backends.base import CacheBackend, key_digest
+from src.utils.logger import get_logger
+
+_MAGIC = b"EMBSHM01"
+_HEADER = struct.Struct("<8sIIQI4s")  # magic, dim, ways, n_slots, itemsize, dtype str
+_HEADER_SIZE = 64
+_READ_RETRIES = 3
+
+# One metadata record per slot. seq is a seqlock counter: writers make it odd
+# while a slot is being rewritten and even again when done, so readers can
+# detect and discard torn reads without taking a lock.
+_SLOT_DTYPE = np.dtype([
+    ("seq", "<u8"),
+    ("key_hi", "<u8"),
+    ("key_lo", "<u8"),
+    ("written_at", "<f8"),
+    ("accessed_at", "<f8"),
+    ("reserved", "<u8")
+])
+
+def _key_words(key: str) -> Tuple[int, int]:
+    digest = key_digest(key)
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+
+class SharedMemoryCacheBackend(CacheBackend):
+    """Embedding cache shared by every worker process on the host.
+
+    The table lives in an mmap'd file (under /dev/shm by default) that each
+    uvicorn worker maps independently. It is set-associative: a key hashes to
+    a bucket of `ways` slots and a full bucket evicts its least recently
+    accessed slot. Readers are lock-free and validate each slot with its
+    seqlock counter; writers take an fcntl lock on just their bucket, so
+    writers to different buckets never contend.
+
+    The dimension and slot count are fixed when the file is created; a
+    process that finds an existing file with a different layout refuses to
+    attach rather than corrupting it.
+    """
+
+    name = "shared_memory"
+
+    def __init__(
+        self,
+        path: str = "/dev/shm/embedding_service_cache",
+        dim: int = 1024,
+        max_size: int = 1000,
+        ttl: int = 3600,
+        dtype: str = "float32",
+        ways: int = 8
+    ):
+        self.path = path
+        self.dim = dim
+        self.ttl = ttl
+        self.dtype = np.dtype(dtype)
+        self.ways = max(1, ways)
+        self.n_buckets = max(1, -(-max_size // self.ways))
+        self.n_slots = self.n_buckets * self.ways
+        self.logger = get_logger()
+
+        meta_size = self.n_slots * _SLOT_DTYPE.itemsize
+        self._vectors_offset = -(-(_HEADER_SIZE + meta_size) // 64) * 64
+        total_size = self._vectors_offset + self.n_slots * self.dim * self.dtype.itemsize
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, total_size)
+                os.pwrite(self._fd, self._header(), 0)
+                self.logger.info(
+                    f"Created shared cache {path} with {self.n_slots} slots "
+                    f"({total_size / (1024 * 1024):.1f} MB)"
+                )
+            compatible = os.pread(self._fd, _HEADER.size, 0) == self._header()
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        if not compatible:
+            os.close(self._fd)
+            raise ValueError(
+                f"Shared cache {path} was created with a different layout; remove it to recreate"
+            )
+
+        self._mmap = mmap.mmap(self._fd, total_size)
+        self._slots = np.frombuffer(
+            self._mmap, dtype=_SLOT_DTYPE, count=self.n_slots, offset=_HEADER_SIZE
+        )
+        self._vectors = np.frombuffer(
+            self._mmap, dtype=self.dtype, count=self.n_slots * self.dim, offset=self._vectors_offset
+        ).reshape(self.n_slots, self.dim)
+
+        self.hits = 0
+        self.misses = 0
+        self.torn_reads = 0
+
+    def _header(self) -> bytes:
+        return _HEADER.pack(
+            _MAGIC, self.dim, self.ways, self.n_slots, self.dtype.itemsize, self.dtype.str.encode()
+        )
+
+    def _bucket(self, key_lo: int) -> range:
+        start = (key_lo % self.n_buckets) * self.ways
+        return range(start, start + self.ways)
+
+    async def get(self, key: str) -> Optional[np.ndarray]:
+        key_hi, key_lo = _key_words(key)
+        now = time.time()
+        for slot in self._bucket(key_lo):
+            for _ in range(_READ_RETRIES):
+                seq = int(self._slots["seq"][slot])
+                if seq & 1:
+                    continue
+                record = self._slots[slot]
+                if record["key_hi"] != key_hi or record["key_lo"] != key_lo:
+                    break
+                written_at = float(record["written_at"])
+                embedding = self._vectors[slot].astype(np.float32)
+                if int(self._slots["seq"][slot]) != seq:
+                    self.torn_reads += 1
+                    continue
+                if written_at == 0 or now - written_at > self.ttl:
+                    break
+
+                # Benign race: a concurrent writer may reuse the slot, which
+                # only skews that bucket's next eviction choice
+                self._slots["accessed_at"][slot] = now
+                self.hits += 1
+                return embedding
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, embedding: np.ndarray):
+        embedding = np.asarray(embedding)
+        if embedding.shape[-1] != self.dim:
+            raise ValueError(
+                f"Embedding dimension {embedding.shape[-1]} does not match cache dimension {self.dim}"
+            )
+
+        key_hi, key_lo = _key_words(key)
+        bucket = self._bucket(key_lo)
+        now = time.time()
+
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, bucket.start)
+        try:
+            target = None
+            oldest_access = None
+            for slot in bucket:
+                record = self._slots[slot]
+                if record["key_hi"] == key_hi and record["key_lo"] == key_lo:
+                    target = slot
+                    break
+                if record["written_at"] == 0 or now - record["written_at"] > self.ttl:
+                    access = -1.0
+                else:
+                    access = float(record["accessed_at"])
+                if oldest_access is None or access < oldest_access:
+                    target, oldest_access = slot, access
+
+            seqs = self._slots["seq"]
+            seqs[target] += 1
+            self._slots["key_hi"][target] = key_hi
+            self._slots["key_lo"][target] = key_lo
+            self._vectors[target] = embedding
+            self._slots["written_at"][target] = now
+            self._slots["accessed_at"][target] = now
+            seqs[target] += 1
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, bucket.start)
+
+    def stats(self) -> dict:
+        now = time.time()
+        written_at = self._slots["written_at"]
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "size": int(np.count_nonzero((written_at > 0) & (now - written_at <= self.ttl))),
+            "max_size": self.n_slots,
+            "dtype": self.dtype.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "torn_reads": self.torn_reads,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    async def close(self):
+        self._slots = None
+        self._vectors = None
+        self._mmap.close()
+        os.close(self._fd)
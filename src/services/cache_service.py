@@ -1,30 +1,113 @@
-from typing import Optional, Dict, List
-import time
+from typing import List, Optional, Sequence
+import hashlib
+import unicodedata
+import numpy as np
+from src.services.cache_backends import CacheBackend, MemoryCacheBackend
+from src.utils.constants import CACHE_KEY_PREFIX
 from src.utils.logger import get_logger
 
+def build_cache_key(text: str, model: str, **options) -> str:
+    """Build a fixed-size cache key for a text, model and encoding options.
+
+    The key is a blake2b digest of the NFC-normalized, whitespace-trimmed text
+    together with the model identifier and any options that change the
+    resulting vector, so it is safe to share across processes and hosts.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(model.encode("utf-8"))
+    for name in sorted(options):
+        digest.update(f"\x00{name}={options[name]}".encode("utf-8"))
+    digest.update(b"\x00\x00")
+    digest.update(unicodedata.normalize("NFC", text).strip().encode("utf-8"))
+    return CACHE_KEY_PREFIX + digest.hexdigest()
+
 class CacheService:
-    def __init__(self, max_size: int = 1000, ttl: int = 3600):
-        self.cache: Dict[str, tuple[List[float], float]] = {}
-        self.max_size = max_size
-        self.ttl = ttl
+    """Embedding cache keyed by build_cache_key digests.
+
+    Storage is delegated to a CacheBackend: an in-process LRU slab by
+    default, or a shared-memory table that every worker process on the host
+    reads and writes. An optional l2 backend (persistent disk or a remote
+    Redis) sits behind it; L1 misses fall through to l2 and l2 hits are
+    promoted back into L1. get_many/set_many let batch callers reach l2 in
+    a single round trip.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        namespace: str = "",
+        l2: Optional[CacheBackend] = None
+    ):
+        self.backend = backend or MemoryCacheBackend()
+        self.l2 = l2
+        self.namespace = namespace
         self.logger = get_logger()
-    
-    async def get(self, text: str) -> Optional[List[float]]:
-        if text in self.cache:
-            embedding, timestamp = self.cache[text]
-            if time.time() - timestamp <= self.ttl:
-                self.logger.info(f"Cache hit for text: {text[:50]}...")
-                return embedding
-            else:
-                # Remove expired entry
-                del self.cache[text]
-        return None
-    
-    async def set(self, text: str, embedding: List[float]):
-        # Implement LRU eviction if cache is full
-        if len(self.cache) >= self.max_size:
-            oldest_key = min(self.cache.items(), key=lambda x: x[1][1])[0]
-            del self.cache[oldest_key]
-        
-        self.cache[text] = (embedding, time.time())
-        self.logger.info(f"Cached embedding for text: {text[:50]}...")
\ No newline at end of file
+
+    def key_for(self, text: str, **options) -> str:
+        return build_cache_key(text, self.namespace, **options)
+
+    async def get(self, text: str, **options) -> Optional[np.ndarray]:
+        key = self.key_for(text, **options)
+        embedding = await self.backend.get(key)
+        if embedding is None and self.l2 is not None:
+            try:
+                embedding = await self.l2.get(key)
+            except Exception as e:
+                self.logger.warning(f"L2 cache lookup failed: {str(e)}")
+            if embedding is not None:
+                await self.backend.set(key, embedding)
+        if embedding is not None:
+            self.logger.info(f"Cache hit for text: {text[:50]}...")
+        return embedding
+
+    async def set(self, text: str, embedding: np.ndarray, **options):
+        key = self.key_for(text, **options)
+        await self.backend.set(key, embedding)
+        if self.l2 is not None:
+            try:
+                await self.l2.set(key, embedding)
+            except Exception as e:
+                self.logger.warning(f"L2 cache write failed: {str(e)}")
+        self.logger.info(f"Cached embedding for text: {text[:50]}...")
+
+    async def get_many(self, texts: Sequence[str], **options) -> List[Optional[np.ndarray]]:
+        keys = [self.key_for(text, **options) for text in texts]
+        embeddings = await self.backend.get_many(keys)
+
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing and self.l2 is not None:
+            try:
+                found = await self.l2.get_many([keys[i] for i in missing])
+            except Exception as e:
+                self.logger.warning(f"L2 cache lookup failed: {str(e)}")
+                found = [None] * len(missing)
+            promoted = [(i, embedding) for i, embedding in zip(missing, found) if embedding is not None]
+            for i, embedding in promoted:
+                embeddings[i] = embedding
+            if promoted:
+                await self.backend.set_many(
+                    [keys[i] for i, _ in promoted],
+                    [embedding for _, embedding in promoted]
+                )
+        return embeddings
+
+    async def set_many(self, texts: Sequence[str], embeddings: Sequence[np.ndarray], **options):
+        keys = [self.key_for(text, **options) for text in texts]
+        await self.backend.set_many(keys, embeddings)
+        if self.l2 is not None:
+            try:
+                await self.l2.set_many(keys, embeddings)
+            except Exception as e:
+                self.logger.warning(f"L2 cache write failed: {str(e)}")
+        self.logger.info(f"Cached {len(keys)} embeddings")
+
+    def stats(self) -> dict:
+        stats = {"backend": self.backend.name, **self.backend.stats()}
+        if self.l2 is not None:
+            stats["l2"] = {"backend": self.l2.name, **self.l2.stats()}
+        return stats
+
+    async def close(self):
+        await self.backend.close()
+        if self.l2 is not None:
+            await self.l2.close()
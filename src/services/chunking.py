@@ -0,0 +1,39 @@
+from typing import List, Tuple
+
+# (start_char, end_char, token_count) of one chunk of a document
+ChunkSpan = Tuple[int, int, int]
+
+def split_into_chunks(tokenizer, texts: List[str], window: int, overlap: int) -> List[List[ChunkSpan]]:
+    """Split each text into overlapping windows of at most `window` tokens.
+
+    Uses the fast tokenizer's offset mapping to cut the original strings at
+    token boundaries, so each chunk is a plain substring that the model can
+    encode without truncation. Texts that already fit get a single chunk.
+    Overlap is capped at half the window, so every chunk moves at least
+    half a window forward however the overlap is configured.
+    """
+    encoded = tokenizer(
+        texts,
+        add_special_tokens=False,
+        return_offsets_mapping=True,
+        truncation=False,
+        verbose=False
+    )
+    overlap = min(max(0, overlap), window // 2)
+    step = max(1, window - overlap)
+
+    spans = []
+    for text, offsets in zip(texts, encoded["offset_mapping"]):
+        n_tokens = len(offsets)
+        if n_tokens <= window:
+            spans.append([(0, len(text), max(1, n_tokens))])
+            continue
+
+        doc_spans = []
+        for start in range(0, n_tokens, step):
+            end = min(start + window, n_tokens)
+            doc_spans.append((offsets[start][0], offsets[end - 1][1], end - start))
+            if end == n_tokens:
+                break
+        spans.append(doc_spans)
+    return spans
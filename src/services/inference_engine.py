@@ -0,0 +1,187 @@
+from typing import Dict, List
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
+
+from src.services.backends.base import InferenceBackend
+from src.services.chunking import ChunkSpan, split_into_chunks
+from src.utils.logger import get_logger
+
+class InferenceEngine:
+    """Runs model inference as a two-stage pipeline off the event loop.
+
+    Texts are split into sub-batches of at most max_batch_size. A single
+    tokenize thread turns each sub-batch into model features with the fast
+    tokenizer's batch mode and hands them to the forward stage through a
+    bounded queue. max_concurrency forward threads run the backend on those
+    features. The forward pass releases the GIL inside the runtime, so batch N+1
+    is tokenized while batch N is still in the model. The queue holds at
+    most prefetch_batches tokenized batches, which bounds the memory held
+    by features waiting for the model.
+    """
+
+    def __init__(
+        self,
+        backend: InferenceBackend,
+        max_concurrency: int = 1,
+        max_batch_size: int = 64,
+        prefetch_batches: int = 2
+    ):
+        self.backend = backend
+        self.model_name = backend.model_name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_batch_size = max(1, max_batch_size)
+        self.logger = get_logger()
+
+        # Tokenizer-only work (counting, chunking) shares the tokenize thread
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tokenize")
+        self._features: queue.Queue = queue.Queue(maxsize=max(1, prefetch_batches))
+        self._stage_lock = threading.Lock()
+        self._stage_stats: Dict[str, Dict[str, float]] = {
+            stage: {"batches": 0, "texts": 0, "seconds": 0.0}
+            for stage in ("tokenize", "queue_wait", "forward")
+        }
+
+        self._forward_threads = [
+            threading.Thread(target=self._forward_loop, name=f"forward-{i}", daemon=True)
+            for i in range(self.max_concurrency)
+        ]
+        for thread in self._forward_threads:
+            thread.start()
+
+    @property
+    def dimension(self) -> int:
+        return self.backend.dimension
+
+    @property
+    def max_seq_length(self) -> int:
+        return self.backend.max_seq_length
+
+    def _record(self, stage: str, texts: int, seconds: float):
+        with self._stage_lock:
+            stats = self._stage_stats[stage]
+            stats["batches"] += 1
+            stats["texts"] += texts
+            stats["seconds"] += seconds
+
+    def _tokenize_stage(self, texts: List[str], future: Future):
+        # Skip batches whose caller has already gone away
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            started = time.perf_counter()
+            features = self.backend.tokenize(texts)
+            self._record("tokenize", len(texts), time.perf_counter() - started)
+        except Exception as e:
+            future.set_exception(e)
+            return
+        # Blocks while the forward stage is prefetch_batches behind
+        self._features.put((features, len(texts), future, time.perf_counter()))
+
+    def _forward_loop(self):
+        while True:
+            job = self._features.get()
+            if job is None:
+                return
+            features, count, future, queued_at = job
+            started = time.perf_counter()
+            self._record("queue_wait", count, started - queued_at)
+            try:
+                result = self.backend.forward(features)
+                self._record("forward", count, time.perf_counter() - started)
+                future.set_result(result)
+            except Exception as e:
+                future.set_exception(e)
+
+    def _submit(self, texts: List[str]) -> List[Future]:
+        futures = []
+        for start in range(0, len(texts), self.max_batch_size):
+            future = Future()
+            self.executor.submit(self._tokenize_stage, texts[start:start + self.max_batch_size], future)
+            futures.append(future)
+        return futures
+
+    def _length_order(self, texts: List[str]) -> np.ndarray:
+        # Longest first so each sub-batch pads to similar lengths
+        return np.argsort([-len(text) for text in texts], kind="stable")
+
+    def encode_blocking(self, texts: List[str]) -> np.ndarray:
+        """Encode texts and wait on the calling thread; for offline jobs that own the process"""
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        order = self._length_order(texts)
+        futures = self._submit([texts[i] for i in order])
+        embeddings = np.concatenate([future.result() for future in futures])
+        return embeddings[np.argsort(order)]
+
+    def _count_tokens(self, texts: List[str]) -> List[int]:
+        encoded = self.backend.tokenizer(
+            texts,
+            truncation=True,
+            max_length=self.max_seq_length
+        )
+        return [len(ids) for ids in encoded["input_ids"]]
+
+    async def count_tokens(self, texts: List[str]) -> List[int]:
+        """Number of tokens the model actually sees for each text, after truncation"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._count_tokens, texts)
+
+    async def chunk(self, texts: List[str], overlap: int) -> List[List[ChunkSpan]]:
+        """Split texts into chunks that fit the model's max sequence length"""
+        # Leave room for the [CLS] and [SEP] tokens the model adds
+        window = self.max_seq_length - 2
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, split_into_chunks, self.backend.tokenizer, texts, window, overlap
+        )
+
+    async def warmup(self, lengths: List[int], batch_size: int) -> Dict[int, float]:
+        """Encode throwaway batches at each token length and return seconds per length.
+
+        The first passes at a new shape pay for lazy allocation and kernel
+        selection; doing them here keeps that cost off real requests.
+        """
+        timings = {}
+        for length in lengths:
+            length = max(1, min(length, self.max_seq_length))
+            text = " ".join(["warmup"] * max(1, length - 2))
+            started = time.perf_counter()
+            await self.encode([text] * max(1, batch_size))
+            timings[length] = time.perf_counter() - started
+        return timings
+
+    async def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts through the tokenize/forward pipeline and return a 2D array"""
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        order = self._length_order(texts)
+        futures = self._submit([texts[i] for i in order])
+        embeddings = await asyncio.gather(*(asyncio.wrap_future(future) for future in futures))
+        return np.concatenate(embeddings)[np.argsort(order)]
+
+    def stats(self) -> dict:
+        """Time spent in each pipeline stage, to show which one is the bottleneck"""
+        with self._stage_lock:
+            stages = {stage: dict(stats) for stage, stats in self._stage_stats.items()}
+        result = {"queued_batches": self._features.qsize()}
+        for stage, stats in stages.items():
+            batches = stats["batches"]
+            result[stage] = {
+                "batches": batches,
+                "texts": stats["texts"],
+                "total_ms": stats["seconds"] * 1000,
+                "average_ms": stats["seconds"] / batches * 1000 if batches else 0.0
+            }
+        return result
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+        for _ in self._forward_threads:
+            self._features.put(None)
+        for thread in self._forward_threads:
+            thread.join()
+        self.logger.info(f"Inference engine for {self.model_name} shut down")
@@ -0,0 +1,173 @@
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Optional, Sequence
+import asyncio
+import time
+
+from src.services.backends import InferenceBackend, create_inference_backend
+from src.services.worker import WorkerService
+from src.utils.logger import get_logger
+
+WorkerFactory = Callable[[str, dict, InferenceBackend], WorkerService]
+
+class ModelRegistry:
+    """Serves several configured models, loading each one on first use.
+
+    Every loaded model has its own WorkerService, and with it its own
+    priority queue, batching and cache. Loaded models are kept in least
+    recently used order. When a load pushes the estimated total past
+    memory_budget_mb, idle models are evicted from the least recently used
+    end. A model is idle when no request holds it and nothing of its own is
+    queued or running. Requests that do not name a model go to
+    default_model.
+
+    Each model is warmed up at warmup_lengths before it is handed out, so
+    the first requests to a freshly loaded model do not pay its cold start.
+    """
+
+    def __init__(
+        self,
+        model_configs: Dict[str, dict],
+        default_model: str,
+        worker_factory: WorkerFactory,
+        memory_budget_mb: float = 0,
+        warmup_lengths: Sequence[int] = (),
+        warmup_batch_size: int = 8
+    ):
+        self.model_configs = model_configs
+        self.default_model = default_model
+        self.worker_factory = worker_factory
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.warmup_lengths = list(warmup_lengths)
+        self.warmup_batch_size = warmup_batch_size
+        self.logger = get_logger()
+
+        self.workers: "OrderedDict[str, WorkerService]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # Seconds spent loading and warming up each model, from its latest load
+        self.load_times: Dict[str, Dict[str, float]] = {}
+        self.loads = 0
+        self.evictions = 0
+
+    def resolve(self, name: Optional[str] = None) -> str:
+        """Return the configured model name to use, raising KeyError for unknown models"""
+        name = name or self.default_model
+        if name not in self.model_configs:
+            raise KeyError(name)
+        return name
+
+    def _backend_config(self, name: str) -> dict:
+        return {**self.model_configs[name], "name": name}
+
+    async def _load(self, name: str) -> WorkerService:
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        backend = await loop.run_in_executor(None, create_inference_backend, self._backend_config(name))
+        worker = self.worker_factory(name, self.model_configs[name], backend)
+        loaded = time.perf_counter()
+
+        warmup = await worker.engine.warmup(self.warmup_lengths, self.warmup_batch_size)
+        worker.start()
+        self.load_times[name] = {
+            "load_seconds": loaded - started,
+            "warmup_seconds": time.perf_counter() - loaded,
+            **{f"warmup_{length}_tokens_seconds": seconds for length, seconds in warmup.items()}
+        }
+
+        self.workers[name] = worker
+        self._last_used[name] = time.monotonic()
+        self.loads += 1
+        self.logger.info(
+            f"Loaded model {name} on {backend.name} in {loaded - started:.1f}s, "
+            f"warmed up in {self.load_times[name]['warmup_seconds']:.1f}s "
+            f"(~{self.memory_bytes(name) / (1024 * 1024):.0f} MB)"
+        )
+        return worker
+
+    async def get(self, name: Optional[str] = None) -> WorkerService:
+        """Return the worker for a model, loading it off the event loop if needed"""
+        name = self.resolve(name)
+        worker = self.workers.get(name)
+        if worker is None:
+            lock = self._locks.setdefault(name, asyncio.Lock())
+            async with lock:
+                worker = self.workers.get(name)
+                if worker is None:
+                    worker = await self._load(name)
+                    await self._evict_over_budget(keep=name)
+
+        self.workers.move_to_end(name)
+        self._last_used[name] = time.monotonic()
+        return worker
+
+    @asynccontextmanager
+    async def use(self, name: Optional[str] = None) -> AsyncIterator[WorkerService]:
+        """Hold a model's worker for the duration of a request so it cannot be evicted"""
+        worker = await self.get(name)
+        worker.active_requests += 1
+        try:
+            yield worker
+        finally:
+            worker.active_requests -= 1
+
+    def memory_bytes(self, name: str) -> int:
+        """Configured memory_mb for a model if set, otherwise the backend's own estimate"""
+        memory_mb = self.model_configs[name].get("memory_mb")
+        if memory_mb:
+            return int(memory_mb * 1024 * 1024)
+        return self.workers[name].engine.backend.memory_bytes
+
+    def total_memory_bytes(self) -> int:
+        return sum(self.memory_bytes(name) for name in self.workers)
+
+    async def _evict_over_budget(self, keep: str):
+        if not self.memory_budget:
+            return
+        for name in list(self.workers):
+            if self.total_memory_bytes() <= self.memory_budget:
+                return
+            if name != keep and self.workers[name].idle:
+                await self.evict(name)
+
+        if self.total_memory_bytes() > self.memory_budget:
+            self.logger.warning(
+                f"Loaded models use ~{self.total_memory_bytes() / (1024 * 1024):.0f} MB, "
+                f"over the {self.memory_budget / (1024 * 1024):.0f} MB budget; other models are busy"
+            )
+
+    async def evict(self, name: str):
+        worker = self.workers.pop(name)
+        self._last_used.pop(name, None)
+        self.evictions += 1
+        await worker.close()
+        self.logger.info(f"Evicted model {name}")
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "default": self.default_model,
+            "available": list(self.model_configs),
+            "memory_budget_mb": self.memory_budget / (1024 * 1024),
+            "memory_mb": self.total_memory_bytes() / (1024 * 1024),
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "loaded": {
+                name: {
+                    "backend": worker.engine.backend.name,
+                    "memory_mb": self.memory_bytes(name) / (1024 * 1024),
+                    "idle_seconds": now - self._last_used[name],
+                    "startup": self.load_times.get(name, {}),
+                    "active_requests": worker.active_requests,
+                    "queues": worker.scheduler.stats(),
+                    "inference": worker.engine.stats(),
+                    "cache": worker.cache_service.stats()
+                }
+                for name, worker in self.workers.items()
+            }
+        }
+
+    async def close(self):
+        while self.workers:
+            _, worker = self.workers.popitem()
+            await worker.close()
@@ -0,0 +1,46 @@
+from typing import Optional
+import numpy as np
+
+EMBEDDING_ENCODINGS = ("float32", "int8", "ubinary")
+
+def validate_output_options(dimension: int, dimensions: Optional[int], encoding: str) -> Optional[str]:
+    """Return why the options cannot be applied to `dimension`-sized embeddings, or None if they can"""
+    if encoding not in EMBEDDING_ENCODINGS:
+        return f"encoding must be one of {', '.join(EMBEDDING_ENCODINGS)}"
+    size = dimensions or dimension
+    if size < 1 or size > dimension:
+        return f"dimensions must be between 1 and {dimension}"
+    if encoding == "ubinary" and size % 8:
+        return "dimensions must be a multiple of 8 for ubinary encoding"
+    return None
+
+def truncate_dimensions(embeddings: np.ndarray, dimensions: Optional[int]) -> np.ndarray:
+    """Keep the first `dimensions` components and rescale to unit length (Matryoshka truncation)"""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if not dimensions or dimensions >= embeddings.shape[-1]:
+        return embeddings
+    truncated = embeddings[..., :dimensions]
+    norms = np.linalg.norm(truncated, axis=-1, keepdims=True)
+    return truncated / np.maximum(norms, 1e-12)
+
+def quantize(embeddings: np.ndarray, encoding: str) -> np.ndarray:
+    """Encode float embeddings as float32, int8 or bit-packed uint8.
+
+    int8 scales each vector by its own largest absolute component, so a
+    vector quantizes the same way whichever batch it arrives in. ubinary
+    keeps the sign of each component, packed eight per byte.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if encoding == "float32":
+        return embeddings
+    if encoding == "int8":
+        scale = np.max(np.abs(embeddings), axis=-1, keepdims=True)
+        scaled = embeddings * (127.0 / np.maximum(scale, 1e-12))
+        return np.rint(scaled).astype(np.int8)
+    if encoding == "ubinary":
+        return np.packbits(embeddings > 0, axis=-1)
+    raise ValueError(f"Unknown embedding encoding: {encoding}")
+
+def apply_output_options(embeddings: np.ndarray, dimensions: Optional[int], encoding: str) -> np.ndarray:
+    """Truncate then quantize a whole batch of embeddings at once"""
+    return quantize(truncate_dimensions(embeddings, dimensions), encoding)
@@ -0,0 +1,423 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import asyncio
+import mmap
+import os
+import select
+import struct
+import time
+import numpy as np
+
+from src.services.backends import InferenceBackend, preload_inference_backend
+from src.services.inference_engine import InferenceEngine
+from src.utils.config_loader import load_config
+from src.utils.cpu_topology import available_cpus, pin_process
+from src.utils.logger import get_logger, setup_logger
+from src.utils.prefork import serve_prefork
+
+# Slot states. A slot belongs to one HTTP worker, which moves it FREE -> READY;
+# the inference process moves it READY -> DONE or ERROR; the worker copies
+# the result out and moves it back to FREE.
+SLOT_FREE = 0
+SLOT_READY = 1
+SLOT_DONE = 2
+SLOT_ERROR = 3
+
+_SLOT_HEADER = np.dtype([
+    ("state", "<u4"),
+    ("count", "<u4"),
+    ("nbytes", "<u4"),
+    ("reserved", "<u4")
+])
+_SLOT_ID = struct.Struct("<I")
+
+class InputTooLargeError(ValueError):
+    """A text that cannot be sent to the inference process whole"""
+
+class InferenceRing:
+    """Shared-memory slots connecting HTTP workers to one inference process.
+
+    Created in the launcher before it forks, so every child inherits the
+    same anonymous mapping and pipes. Each HTTP worker owns slots_per_worker
+    slots and is the only writer of their requests, so claiming a slot takes
+    no cross-process lock. A request is a batch of up to slot_texts texts,
+    packed as UTF-8 with an offsets table. The inference process writes the
+    float32 embeddings straight into the slot's vector block. Slot ids travel
+    over pipes: one submission pipe read by the inference process, and one
+    completion pipe per worker that its event loop watches.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        dimension: int,
+        slots_per_worker: int = 4,
+        slot_texts: int = 64,
+        slot_bytes: int = 1 << 20
+    ):
+        self.workers = workers
+        self.dimension = dimension
+        self.slots_per_worker = slots_per_worker
+        self.slot_texts = slot_texts
+        self.slot_bytes = slot_bytes
+        self.n_slots = workers * slots_per_worker
+
+        sizes = [
+            self.n_slots * _SLOT_HEADER.itemsize,
+            self.n_slots * (slot_texts + 1) * 4,
+            self.n_slots * slot_bytes,
+            self.n_slots * slot_texts * dimension * 4
+        ]
+        offsets = np.cumsum([0] + [-(-size // 64) * 64 for size in sizes])
+        self._mmap = mmap.mmap(-1, int(offsets[-1]))
+
+        self.headers = np.frombuffer(self._mmap, dtype=_SLOT_HEADER, count=self.n_slots, offset=offsets[0])
+        self.offsets = np.frombuffer(
+            self._mmap, dtype="<u4", count=self.n_slots * (slot_texts + 1), offset=offsets[1]
+        ).reshape(self.n_slots, slot_texts + 1)
+        self.blobs = np.frombuffer(
+            self._mmap, dtype=np.uint8, count=self.n_slots * slot_bytes, offset=offsets[2]
+        ).reshape(self.n_slots, slot_bytes)
+        self.vectors = np.frombuffer(
+            self._mmap, dtype="<f4", count=self.n_slots * slot_texts * dimension, offset=offsets[3]
+        ).reshape(self.n_slots, slot_texts, dimension)
+
+        self.submit_read, self.submit_write = os.pipe()
+        self.done_pipes = [os.pipe() for _ in range(workers)]
+
+    def owner(self, slot: int) -> int:
+        return slot // self.slots_per_worker
+
+    def worker_slots(self, worker: int) -> range:
+        start = worker * self.slots_per_worker
+        return range(start, start + self.slots_per_worker)
+
+    def read_texts(self, slot: int) -> List[str]:
+        count = int(self.headers["count"][slot])
+        offsets = self.offsets[slot, :count + 1]
+        blob = self.blobs[slot].tobytes()[:offsets[-1]]
+        return [blob[offsets[i]:offsets[i + 1]].decode("utf-8", "surrogatepass") for i in range(count)]
+
+    def write_error(self, slot: int, message: str):
+        encoded = message.encode("utf-8")[:self.slot_bytes]
+        self.blobs[slot, :len(encoded)] = np.frombuffer(encoded, dtype=np.uint8)
+        self.headers["nbytes"][slot] = len(encoded)
+        self.headers["state"][slot] = SLOT_ERROR
+
+def _read_slot_ids(fd: int, buffer: bytearray) -> List[int]:
+    """Drain whole slot ids from a pipe, keeping any partial trailing bytes in buffer"""
+    try:
+        buffer += os.read(fd, 4096)
+    except BlockingIOError:
+        pass
+    whole = len(buffer) - len(buffer) % _SLOT_ID.size
+    ids = [slot for (slot,) in _SLOT_ID.iter_unpack(bytes(buffer[:whole]))]
+    del buffer[:whole]
+    return ids
+
+def _answer(ring: InferenceRing, slot: int, error: Optional[str] = None):
+    """Mark a slot done, or failed with error, and wake the worker that owns it"""
+    if error is None:
+        ring.headers["state"][slot] = SLOT_DONE
+    else:
+        ring.write_error(slot, error)
+    os.write(ring.done_pipes[ring.owner(slot)][1], _SLOT_ID.pack(slot))
+
+def serve_inference(
+    ring: InferenceRing,
+    backend: InferenceBackend,
+    batch_texts: int = 128,
+    max_wait_ms: float = 2.0,
+    **engine_kwargs
+):
+    """Inference process main loop: batch requests from every worker and run the model.
+
+    After the first ready slot arrives, the loop keeps collecting slots for up
+    to max_wait_ms or until batch_texts texts are waiting, so requests from
+    different HTTP workers share one batch. A slot that cannot be read is
+    answered with an error on its own; the loop itself never stops.
+    """
+    logger = get_logger()
+    engine = InferenceEngine(backend, **engine_kwargs)
+    max_wait = max_wait_ms / 1000.0
+    os.set_blocking(ring.submit_read, False)
+    buffer = bytearray()
+    logger.info(f"Inference process {os.getpid()} serving {ring.workers} workers")
+
+    while True:
+        select.select([ring.submit_read], [], [])
+        slots = _read_slot_ids(ring.submit_read, buffer)
+        deadline = time.monotonic() + max_wait
+        while sum(int(ring.headers["count"][slot]) for slot in slots) < batch_texts:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([ring.submit_read], [], [], remaining)[0]:
+                break
+            slots += _read_slot_ids(ring.submit_read, buffer)
+        if not slots:
+            continue
+
+        texts = []
+        counts = []
+        for slot in slots:
+            try:
+                slot_texts = ring.read_texts(slot)
+            except Exception as e:
+                logger.error(f"Unreadable request in slot {slot}: {str(e)}")
+                _answer(ring, slot, f"Unreadable request: {str(e)}")
+                continue
+            texts.extend(slot_texts)
+            counts.append((slot, len(slot_texts)))
+        if not counts:
+            continue
+
+        try:
+            embeddings = engine.encode_blocking(texts)
+        except Exception as e:
+            logger.error(f"Inference failed for {len(counts)} requests: {str(e)}")
+            for slot, _ in counts:
+                _answer(ring, slot, str(e))
+            continue
+
+        start = 0
+        for slot, count in counts:
+            ring.vectors[slot, :count] = embeddings[start:start + count]
+            start += count
+            _answer(ring, slot)
+
+class RingClient:
+    """An HTTP worker's side of the ring: claims its slots and awaits their results.
+
+    Texts are never clipped to fit a slot. Texts longer than
+    max_text_length characters, or too large for a slot on their own, raise
+    InputTooLargeError; otherwise a call is split across as many slots as
+    its texts need. A slot not answered within request_timeout seconds
+    fails its caller instead of waiting forever.
+    """
+
+    def __init__(
+        self,
+        ring: InferenceRing,
+        worker: int,
+        model_name: str,
+        max_text_length: Optional[int] = None,
+        request_timeout: float = 30.0
+    ):
+        self.ring = ring
+        self.worker = worker
+        self.model_name = model_name
+        self.max_text_length = max_text_length
+        self.request_timeout = request_timeout
+        self.done_read = ring.done_pipes[worker][0]
+        os.set_blocking(self.done_read, False)
+
+        self._free: Optional[asyncio.Queue] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        # Slots whose caller was cancelled while the inference process still had them
+        self._abandoned = set()
+        self._buffer = bytearray()
+        self.requests = 0
+        self.texts = 0
+        self.total_wait = 0.0
+        self.timeouts = 0
+
+    def _start(self):
+        loop = asyncio.get_running_loop()
+        self._free = asyncio.Queue()
+        for slot in self.ring.worker_slots(self.worker):
+            self._free.put_nowait(slot)
+        loop.add_reader(self.done_read, self._on_done)
+
+    def _release(self, slot: int):
+        self.ring.headers["state"][slot] = SLOT_FREE
+        self._free.put_nowait(slot)
+
+    def _on_done(self):
+        for slot in _read_slot_ids(self.done_read, self._buffer):
+            future = self._pending.pop(slot, None)
+            if slot in self._abandoned:
+                self._abandoned.discard(slot)
+                self._release(slot)
+            elif future is not None and not future.done():
+                future.set_result(None)
+
+    def _split(self, texts: List[str]) -> List[List[bytes]]:
+        """UTF-8 encode texts and group them into runs that each fit one slot"""
+        ring = self.ring
+        pieces: List[List[bytes]] = []
+        piece: List[bytes] = []
+        size = 0
+        for text in texts:
+            if self.max_text_length is not None and len(text) > self.max_text_length:
+                raise InputTooLargeError(f"Text exceeds {self.max_text_length} characters")
+            encoded = text.encode("utf-8", "surrogatepass")
+            if len(encoded) > ring.slot_bytes:
+                raise InputTooLargeError(
+                    f"Text of {len(encoded)} UTF-8 bytes exceeds the {ring.slot_bytes}-byte inference slot"
+                )
+            if piece and (len(piece) == ring.slot_texts or size + len(encoded) > ring.slot_bytes):
+                pieces.append(piece)
+                piece, size = [], 0
+            piece.append(encoded)
+            size += len(encoded)
+        if piece:
+            pieces.append(piece)
+        return pieces
+
+    def _pack(self, slot: int, encoded: List[bytes]):
+        ring = self.ring
+        position = 0
+        ring.offsets[slot, 0] = 0
+        for i, data in enumerate(encoded):
+            ring.blobs[slot, position:position + len(data)] = np.frombuffer(data, dtype=np.uint8)
+            position += len(data)
+            ring.offsets[slot, i + 1] = position
+        ring.headers["count"][slot] = len(encoded)
+        ring.headers["nbytes"][slot] = position
+
+    async def _request(self, encoded: List[bytes]) -> np.ndarray:
+        if self._free is None:
+            self._start()
+        try:
+            slot = await asyncio.wait_for(self._free.get(), self.request_timeout)
+        except asyncio.TimeoutError as e:
+            self.timeouts += 1
+            raise RuntimeError(f"No inference slot came free within {self.request_timeout:g}s") from e
+        self._pack(slot, encoded)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[slot] = future
+        self.ring.headers["state"][slot] = SLOT_READY
+        started = time.perf_counter()
+        os.write(self.ring.submit_write, _SLOT_ID.pack(slot))
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.request_timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError) as e:
+            # The inference process still owns the slot; reuse it once its result is in
+            self._abandoned.add(slot)
+            if isinstance(e, asyncio.TimeoutError):
+                self.timeouts += 1
+                raise RuntimeError(f"Inference process did not answer within {self.request_timeout:g}s") from e
+            raise
+        self.total_wait += time.perf_counter() - started
+
+        try:
+            if self.ring.headers["state"][slot] == SLOT_ERROR:
+                nbytes = int(self.ring.headers["nbytes"][slot])
+                raise RuntimeError(self.ring.blobs[slot, :nbytes].tobytes().decode("utf-8", "replace"))
+            return self.ring.vectors[slot, :len(encoded)].copy()
+        finally:
+            self._release(slot)
+
+    async def encode(self, texts: List[str]) -> np.ndarray:
+        parts = await asyncio.gather(*(self._request(piece) for piece in self._split(texts)))
+        self.requests += len(parts)
+        self.texts += len(texts)
+        return np.concatenate(parts)
+
+    def stats(self) -> dict:
+        return {
+            "architecture": "shared-inference",
+            "worker": self.worker,
+            "requests": self.requests,
+            "texts": self.texts,
+            "slots_in_use": len(self._pending),
+            "timeouts": self.timeouts,
+            "average_round_trip_ms": self.total_wait / self.requests * 1000 if self.requests else 0.0
+        }
+
+class RemoteInferenceEngine(InferenceEngine):
+    """InferenceEngine for HTTP workers that forwards encoding to the inference process.
+
+    Tokenizer work (counting, chunking) still runs locally on the worker's
+    copy of the tokenizer; only the model forward pass is remote.
+    """
+
+    def __init__(self, client: RingClient, backend: InferenceBackend, max_batch_size: int = 64):
+        self.client = client
+        self.backend = backend
+        self.model_name = backend.model_name
+        self.max_concurrency = 1
+        self.max_batch_size = max(1, max_batch_size)
+        self.logger = get_logger()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tokenize")
+
+    def encode_blocking(self, texts: List[str]) -> np.ndarray:
+        raise RuntimeError("encode_blocking is not available in shared-inference HTTP workers")
+
+    async def encode(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return await self.client.encode(texts)
+
+    def stats(self) -> dict:
+        return self.client.stats()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+        self.logger.info(f"Remote inference engine for {self.model_name} shut down")
+
+# Set in each HTTP worker forked by the shared-inference launcher
+_client: Optional[RingClient] = None
+
+def attach_remote_client(client: RingClient):
+    global _client
+    _client = client
+
+def get_remote_client() -> Optional[RingClient]:
+    return _client
+
+def serve_shared_inference(config_kwargs: dict, workers: int, inference_threads: Optional[int] = None) -> int:
+    """Run HTTP workers in front of one inference process that owns the model.
+
+    The launcher loads the default model, sizes the ring for its dimension
+    and forks the inference process and then the HTTP workers. The workers
+    only parse, validate and check the cache; every encode goes through the
+    ring, so batches are formed across all workers and only one process runs
+    the model. Other registry models still load inside each HTTP worker.
+    When inference_threads is set the inference process sizes its
+    intra-op thread pools to it. Returns the launcher's exit status.
+    """
+    state = {}
+
+    def preload():
+        setup_logger()
+        config = load_config()
+        ipc_config = config.get("ipc", {})
+        worker_config = config.get("worker", {})
+        max_text_length = config.get("api", {}).get("max_text_length", 10000)
+        state["config"] = config
+        state["backend"] = preload_inference_backend(config.get("model", {}))
+        state["ring"] = InferenceRing(
+            workers,
+            state["backend"].dimension,
+            slots_per_worker=ipc_config.get("slots_per_worker", 4),
+            slot_texts=ipc_config.get("slot_texts", worker_config.get("max_encode_batch_size", 64)),
+            # Room for any accepted text: up to 4 UTF-8 bytes per character
+            slot_bytes=max(ipc_config.get("slot_bytes", 1 << 20), max_text_length * 4)
+        )
+
+    def inference():
+        if inference_threads:
+            pin_process(available_cpus(), inference_threads)
+        ipc_config = state["config"].get("ipc", {})
+        worker_config = state["config"].get("worker", {})
+        serve_inference(
+            state["ring"],
+            state["backend"],
+            batch_texts=ipc_config.get("batch_texts", 128),
+            max_wait_ms=ipc_config.get("max_wait_ms", 2.0),
+            max_concurrency=worker_config.get("inference_concurrency", 1),
+            max_batch_size=worker_config.get("max_encode_batch_size", 64),
+            prefetch_batches=worker_config.get("prefetch_batches", 2)
+        )
+
+    def worker_init(index: int):
+        config = state["config"]
+        attach_remote_client(RingClient(
+            state["ring"],
+            index,
+            state["backend"].model_name,
+            max_text_length=config.get("api", {}).get("max_text_length", 10000),
+            request_timeout=config.get("ipc", {}).get("request_timeout", 30)
+        ))
+
+    return serve_prefork(config_kwargs, workers, preload, helpers=[inference], worker_init=worker_init)
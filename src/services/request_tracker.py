@@ -1,59 +1,184 @@
-from typing import Dict, Optional
-from src.models.pydantic_models import StatusResponse, ResultResponse
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import time
+import numpy as np
+from src.models.pydantic_models import Priority, StatusResponse
 from src.utils.logger import get_logger
 
 class RequestTracker:
-    def __init__(self):
-        self.requests: Dict[str, Dict] = {}
+    """Status and results of queued requests, bounded in size and age.
+
+    Entries are kept in an OrderedDict in the order they last changed, and
+    every change sets the entry to expire ttl seconds later, so expired
+    entries are always at the front and are dropped in O(1) each. Beyond
+    max_size the oldest entries are dropped too. A completed or failed
+    result is removed once it has been fetched, and embeddings are held as
+    float32 arrays of their own rather than lists or views into a batch.
+
+    Each request gets a ticket when queued, counting up per queue and
+    priority. The scheduler does not start a lane's requests in ticket
+    order, since it groups similar lengths, so each lane keeps a watermark
+    below which every ticket has started plus a sorted list of the started
+    tickets above it. A position is the request's ticket minus the earlier
+    tickets that have started, found by bisecting that short list rather
+    than scanning the queue.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 600):
+        self.requests: "OrderedDict[str, Dict]" = OrderedDict()
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
         self.logger = get_logger()
-    
-    async def update_queue_position(self, request_id: str):
-        self.requests[request_id] = {
-            "status": "pending",
-            "queue_position": len(self.requests) + 1
-        }
-    
-    async def complete_request(self, request_id: str, embedding: list[float], cache_hit: bool):
-        self.requests[request_id] = {
+
+        self._queued: Dict[Tuple[str, Priority], int] = {}
+        # Per lane: every ticket below the watermark has started, plus the started tickets above it
+        self._watermarks: Dict[Tuple[str, Priority], int] = {}
+        self._started: Dict[Tuple[str, Priority], List[int]] = {}
+        # Tickets of queued requests, kept apart from entries that may be evicted
+        self._tickets: Dict[str, int] = {}
+        self.expirations = 0
+        self.evictions = 0
+
+    def _expire(self):
+        now = time.monotonic()
+        while self.requests:
+            request_id, request = next(iter(self.requests.items()))
+            if request["expires"] > now:
+                break
+            del self.requests[request_id]
+            self.expirations += 1
+
+    def _store(self, request_id: str, request: Dict):
+        self._expire()
+        request["expires"] = time.monotonic() + self.ttl
+        self.requests[request_id] = request
+        self.requests.move_to_end(request_id)
+        while len(self.requests) > self.max_size:
+            self.requests.popitem(last=False)
+            self.evictions += 1
+
+    def _get(self, request_id: str) -> Optional[Dict]:
+        self._expire()
+        return self.requests.get(request_id)
+
+    async def update_queue_position(self, request_id: str, priority: Priority = Priority.MEDIUM, queue: str = "default"):
+        lane = (queue, priority)
+        ticket = self._queued.get(lane, 0)
+        self._queued[lane] = ticket + 1
+        self._tickets[request_id] = ticket
+        self._store(request_id, {"status": "pending", "lane": lane, "ticket": ticket})
+
+    async def start_request(self, request_id: str, priority: Priority = Priority.MEDIUM, queue: str = "default"):
+        """Mark a queued request as taken off the queue by its worker.
+
+        The ticket counts as started even if the entry itself has been
+        evicted, so positions of the requests behind it stay right.
+        """
+        ticket = self._tickets.pop(request_id, None)
+        if ticket is not None:
+            lane = (queue, priority)
+            started = self._started.setdefault(lane, [])
+            insort(started, ticket)
+            watermark = self._watermarks.get(lane, 0)
+            while started and started[0] == watermark:
+                started.pop(0)
+                watermark += 1
+            self._watermarks[lane] = watermark
+        if request_id in self.requests:
+            self._store(request_id, {"status": "processing"})
+
+    async def complete_request(
+        self,
+        request_id: str,
+        embedding: np.ndarray,
+        cache_hit: bool,
+        dimensions: Optional[int] = None,
+        encoding: str = "float32"
+    ):
+        """Store a full float32 result with the output options to apply when it is fetched"""
+        self._store(request_id, {
             "status": "completed",
-            "embedding": embedding,
+            "embedding": np.array(embedding, dtype=np.float32),
             "cache_hit": cache_hit,
-            "queue_position": None
-        }
-    
+            "dimensions": dimensions,
+            "encoding": encoding
+        })
+
     async def fail_request(self, request_id: str, error: str):
-        self.requests[request_id] = {
+        self._store(request_id, {
             "status": "failed",
-            "error": error,
-            "queue_position": None
-        }
-    
+            "error": error
+        })
+
+    def queue_position(self, request: Dict) -> Optional[int]:
+        """1-based position among requests queued ahead in the same queue and priority"""
+        if request["status"] != "pending":
+            return None
+        lane, ticket = request["lane"], request["ticket"]
+        started_ahead = self._watermarks.get(lane, 0) + bisect_left(self._started.get(lane, []), ticket)
+        return ticket - started_ahead + 1
+
     async def get_status(self, request_id: str) -> Optional[StatusResponse]:
-        if request_id not in self.requests:
+        request = self._get(request_id)
+        if request is None:
             return None
-            
-        request = self.requests[request_id]
+
         return StatusResponse(
             request_id=request_id,
             status=request["status"],
             cache_hit=request.get("cache_hit", False),
-            queue_position=request.get("queue_position"),
+            queue_position=self.queue_position(request),
             error=request.get("error")
         )
-    
-    async def get_result(self, request_id: str) -> Optional[ResultResponse]:
-        if request_id not in self.requests:
+
+    async def get_result_payload(self, request_id: str) -> Optional[Dict]:
+        """Result fields with the embedding left as a NumPy array.
+
+        A completed result also carries the dimensions and encoding it was
+        requested with. A completed or failed request is forgotten once its
+        result is returned.
+        """
+        request = self._get(request_id)
+        if request is None:
             return None
-            
-        request = self.requests[request_id]
+
+        if request["status"] in ("pending", "processing"):
+            return {
+                "request_id": request_id,
+                "embedding": None,
+                "cache_hit": False,
+                "error": "Result not ready"
+            }
+
+        del self.requests[request_id]
         if request["status"] != "completed":
-            return ResultResponse(
-                request_id=request_id,
-                error="Result not ready" if request["status"] == "pending" else request.get("error")
-            )
-            
-        return ResultResponse(
-            request_id=request_id,
-            embedding=request["embedding"],
-            cache_hit=request["cache_hit"]
-        )
\ No newline at end of file
+            return {
+                "request_id": request_id,
+                "embedding": None,
+                "cache_hit": False,
+                "error": request.get("error")
+            }
+
+        return {
+            "request_id": request_id,
+            "embedding": request["embedding"],
+            "cache_hit": request["cache_hit"],
+            "error": None,
+            "dimensions": request["dimensions"],
+            "encoding": request["encoding"]
+        }
+
+    def stats(self) -> dict:
+        self._expire()
+        counts: Dict[str, int] = {}
+        for request in self.requests.values():
+            counts[request["status"]] = counts.get(request["status"], 0) + 1
+        return {
+            "tracked": len(self.requests),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "by_status": counts,
+            "expirations": self.expirations,
+            "evictions": self.evictions
+        }
@@ -1,78 +1,245 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 import asyncio
-from collections import deque
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
 from src.utils.logger import get_logger
 from src.services.cache_service import CacheService
 from src.services.request_tracker import RequestTracker
 from src.services.metrics_service import MetricsService
+from src.services.scheduler import PriorityScheduler
+from src.services.inference_engine import InferenceEngine
+from src.services.backends import InferenceBackend
 from src.models.pydantic_models import EmbeddingRequest, Priority
 
 class WorkerService:
-    def __init__(self, cache_service: CacheService, request_tracker: RequestTracker):
+    def __init__(
+        self,
+        cache_service: CacheService,
+        request_tracker: RequestTracker,
+        backend: InferenceBackend,
+        batch_size: int = 10,
+        max_wait_ms: float = 5.0,
+        max_queue_size: int = 1000,
+        aging_rate: float = 1.0,
+        priority_weights: Optional[Dict[Priority, float]] = None,
+        length_window: int = 40,
+        max_bucket_delay_ms: float = 100.0,
+        inference_concurrency: int = 1,
+        max_encode_batch_size: int = 64,
+        prefetch_batches: int = 2,
+        chunk_overlap_tokens: int = 64,
+        engine: Optional[InferenceEngine] = None
+    ):
         self.cache_service = cache_service
         self.request_tracker = request_tracker
         self.logger = get_logger()
         self.metrics_service = MetricsService()
-        
-        # Separate queues for different priorities
-        self.queues: Dict[Priority, deque] = {
-            Priority.HIGH: deque(),
-            Priority.MEDIUM: deque(),
-            Priority.LOW: deque()
-        }
-        
-        # Start the worker
-        asyncio.create_task(self._process_queue())
-        self.model = SentenceTransformer("mixedbread-ai/mxbai-embed-large-v1")
-    
+
+        # Batching settings: a batch is flushed once it holds batch_size
+        # requests or max_wait_ms has passed since its first request arrived
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.chunk_overlap_tokens = chunk_overlap_tokens
+
+        # Priority scheduler that wakes the worker as soon as work arrives
+        # and groups requests of similar length into the same batch
+        self.scheduler = PriorityScheduler(
+            weights=priority_weights,
+            aging_rate=aging_rate,
+            max_queue_size=max_queue_size,
+            window=length_window,
+            max_delay_ms=max_bucket_delay_ms
+        )
+
+        # Callers currently holding this worker, and whether a queued batch is running
+        self.active_requests = 0
+        self._processing = False
+
+        self._queue_task: Optional[asyncio.Task] = None
+        # An engine passed in (e.g. one backed by a shared inference process)
+        # replaces the in-process one built from the backend
+        self.engine = engine or InferenceEngine(
+            backend,
+            max_concurrency=inference_concurrency,
+            max_batch_size=max_encode_batch_size,
+            prefetch_batches=prefetch_batches
+        )
+
+    def start(self):
+        """Start consuming the priority queue; needs a running event loop"""
+        if self._queue_task is None:
+            self._queue_task = asyncio.create_task(self._process_queue())
+
+    @property
+    def idle(self) -> bool:
+        """True when no caller holds this worker and no queued work is pending or running"""
+        return not self.active_requests and not len(self.scheduler) and not self._processing
+
+    async def close(self):
+        """Stop the queue consumer, release the model and close the cache"""
+        if self._queue_task is not None:
+            self._queue_task.cancel()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.engine.shutdown)
+        await self.cache_service.close()
+
     async def queue_request(self, request_id: str, request: EmbeddingRequest):
-        self.queues[request.priority].append((request_id, request))
-        await self.request_tracker.update_queue_position(request_id)
+        self.scheduler.put((request_id, request), request.priority, self.estimate_tokens(request.text))
+        await self.request_tracker.update_queue_position(request_id, request.priority, self.engine.model_name)
         await self.metrics_service.track_request_start(request_id, request.priority.value)
         self.logger.info(f"Queued request {request_id} with priority {request.priority}")
-    
-    async def process_text(self, text: str) -> list[float]:
-        """Simulate embedding generation"""
-        #await asyncio.sleep(1)  # Simulate processing time
-        return self.model.encode(text).tolist()
-    
+
+    def estimate_tokens(self, text: str) -> int:
+        """Cheap token count estimate (~4 characters per token) used to group similar lengths"""
+        return min(len(text) // 4 + 2, self.engine.max_seq_length)
+
+    async def process_text(self, text: str) -> np.ndarray:
+        """Generate the embedding for a single text"""
+        embeddings = await self.engine.encode([text])
+        return embeddings[0]
+
+    async def process_batch(self, texts: List[str]) -> np.ndarray:
+        """Generate embeddings for a list of texts in one forward pass"""
+        return await self.engine.encode(texts)
+
+    async def embed_many(self, texts: List[str], use_cache: bool = True) -> Tuple[np.ndarray, List[bool]]:
+        """Embed a list of texts, returning vectors in input order and per-item cache hits.
+
+        Duplicate texts are looked up and encoded once, cached texts are
+        answered from the cache and the remaining misses go through a single
+        encode call.
+        """
+        unique_texts = list(dict.fromkeys(texts))
+        if use_cache:
+            vectors = await self.cache_service.get_many(unique_texts)
+        else:
+            vectors = [None] * len(unique_texts)
+        hits = [vector is not None for vector in vectors]
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            missing_texts = [unique_texts[i] for i in missing]
+            encoded = await self.process_batch(missing_texts)
+            for i, embedding in zip(missing, encoded):
+                vectors[i] = embedding
+            if use_cache:
+                await self.cache_service.set_many(missing_texts, encoded)
+
+        positions = {text: i for i, text in enumerate(unique_texts)}
+        order = [positions[text] for text in texts]
+        return np.stack(vectors)[order], [hits[i] for i in order]
+
+    async def embed_documents(
+        self,
+        texts: List[str],
+        pooling: Union[str, Sequence[str]] = "weighted",
+        return_chunks: bool = False,
+        use_cache: bool = True
+    ) -> Tuple[np.ndarray, List[bool], Optional[List[np.ndarray]]]:
+        """Embed full documents by encoding overlapping chunks and pooling them.
+
+        The chunks of every document go through one embed_many call, so they
+        share batches and the chunk-level cache. Chunk vectors are pooled
+        back into one vector per document, either as a plain mean or
+        weighted by each chunk's token count; pooling is one mode for all
+        documents or one per document. A document counts as a cache hit
+        only if all of its chunks were.
+        """
+        spans = await self.engine.chunk(texts, self.chunk_overlap_tokens)
+        chunk_texts = [text[start:end] for text, doc_spans in zip(texts, spans) for start, end, _ in doc_spans]
+        chunk_vectors, chunk_hits = await self.embed_many(chunk_texts, use_cache=use_cache)
+
+        counts = [len(doc_spans) for doc_spans in spans]
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        poolings = [pooling] * len(texts) if isinstance(pooling, str) else list(pooling)
+        weights = np.array([
+            tokens if mode == "weighted" else 1
+            for mode, doc_spans in zip(poolings, spans)
+            for _, _, tokens in doc_spans
+        ], dtype=np.float32)
+
+        pooled = np.add.reduceat(chunk_vectors * weights[:, None], starts, axis=0)
+        pooled /= np.add.reduceat(weights, starts)[:, None]
+
+        cache_hits = [all(chunk_hits[start:start + count]) for start, count in zip(starts, counts)]
+        chunks = np.split(chunk_vectors, starts[1:]) if return_chunks else None
+        return pooled, cache_hits, chunks
+
+    async def _process_batch(self, batch: List[Tuple[str, EmbeddingRequest]]):
+        # Requests already answered; if anything below raises, every other
+        # request in the batch is failed rather than left pending for good
+        answered = set()
+        try:
+            for request_id, request in batch:
+                await self.request_tracker.start_request(request_id, request.priority, self.engine.model_name)
+
+            # Long documents: the chunks of every queued document share one embed_many call
+            documents = [(request_id, request) for request_id, request in batch if request.long_text == "chunk"]
+            if documents:
+                pooled, cache_hits, _ = await self.embed_documents(
+                    [request.text for _, request in documents],
+                    pooling=[request.pooling for _, request in documents]
+                )
+                for (request_id, request), embedding, cache_hit in zip(documents, pooled, cache_hits):
+                    await self.request_tracker.complete_request(
+                        request_id, embedding, cache_hit, request.dimensions, request.encoding
+                    )
+                    answered.add(request_id)
+                    await self.metrics_service.track_request_complete(request_id, cache_hit)
+                self.logger.info(f"Processed {len(documents)} chunked documents")
+
+            single = [(request_id, request) for request_id, request in batch if request.long_text != "chunk"]
+            if not single:
+                return
+
+            # Answer cached requests directly and only encode the misses
+            cached_results = await self.cache_service.get_many([request.text for _, request in single])
+            pending: List[Tuple[str, EmbeddingRequest]] = []
+            for (request_id, request), cached_result in zip(single, cached_results):
+                if cached_result is not None:
+                    await self.request_tracker.complete_request(
+                        request_id, cached_result, True, request.dimensions, request.encoding
+                    )
+                    answered.add(request_id)
+                    await self.metrics_service.track_request_complete(request_id, True)
+                else:
+                    pending.append((request_id, request))
+
+            if not pending:
+                return
+
+            embeddings = await self.process_batch([request.text for _, request in pending])
+
+            # Cache the results; the embeddings are good even if caching fails
+            try:
+                await self.cache_service.set_many([request.text for _, request in pending], embeddings)
+            except Exception as e:
+                self.logger.warning(f"Could not cache batch of {len(pending)} results: {str(e)}")
+
+            for (request_id, request), embedding in zip(pending, embeddings):
+                # Update request status
+                await self.request_tracker.complete_request(
+                    request_id, embedding, False, request.dimensions, request.encoding
+                )
+                answered.add(request_id)
+                await self.metrics_service.track_request_complete(request_id, False)
+
+            self.logger.info(f"Processed batch of {len(pending)} requests")
+        except Exception as e:
+            failed = [request_id for request_id, _ in batch if request_id not in answered]
+            self.logger.error(f"Error processing batch of {len(failed)} requests: {str(e)}")
+            for request_id in failed:
+                await self.request_tracker.fail_request(request_id, str(e))
+                await self.metrics_service.track_request_failed(request_id)
+
     async def _process_queue(self):
         while True:
-            request_id = None
-            request = None
-            
-            # Process high priority first, then medium, then low
-            for priority in Priority:
-                if self.queues[priority]:
-                    request_id, request = self.queues[priority].popleft()
-                    break
-            
-            if request_id and request:
-                try:
-                    # Check cache first
-                    cached_result = await self.cache_service.get(request.text)
-                    if cached_result:
-                        await self.request_tracker.complete_request(request_id, cached_result, True)
-                        await self.metrics_service.track_request_complete(request_id, True)
-                        continue
-
-                    # Process the request
-                    embedding = await self.process_text(request.text)
-                    
-                    # Cache the result
-                    await self.cache_service.set(request.text, embedding)
-                    
-                    # Update request status
-                    await self.request_tracker.complete_request(request_id, embedding, False)
-                    await self.metrics_service.track_request_complete(request_id, False)
-                    
-                    self.logger.info(f"Processed request {request_id}")
-                except Exception as e:
-                    self.logger.error(f"Error processing request {request_id}: {str(e)}")
-                    await self.request_tracker.fail_request(request_id, str(e))
-                    await self.metrics_service.track_request_failed(request_id)
-            
-            await asyncio.sleep(1)  # Prevent CPU spinning
\ No newline at end of file
+            batch = await self.scheduler.get_batch(self.batch_size, self.max_wait)
+            self._processing = True
+            try:
+                await self._process_batch(batch)
+            except Exception as e:
+                # Keep consuming the queue whatever went wrong with one batch
+                self.logger.error(f"Unhandled error in batch of {len(batch)} requests: {str(e)}")
+            finally:
+                self._processing = False
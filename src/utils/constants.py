@@ -1,15 +1,56 @@
+DEFAULT_MODEL_NAME = "mixedbread-ai/mxbai-embed-large-v1"
+
 DEFAULT_CONFIG = {
+    "model": {
+        "name": DEFAULT_MODEL_NAME,
+        "revision": "main",
+        "backend": "torch"
+    },
+    "startup": {
+        "warmup_lengths": [16, 128, 512],
+        "warmup_batch_size": 8
+    },
+    "models": {
+        "memory_budget_mb": 0,
+        "registry": {}
+    },
+    "tracker": {
+        "max_size": 10000,
+        "ttl": 600
+    },
+    "ipc": {
+        "slots_per_worker": 4,
+        "slot_texts": 64,
+        "slot_bytes": 1048576,
+        "batch_texts": 128,
+        "max_wait_ms": 2,
+        "request_timeout": 30
+    },
     "cache": {
         "max_size": 1000,
-        "ttl": 3600  # 1 hour
+        "ttl": 3600,  # 1 hour
+        "dtype": "float32",
+        "backend": "memory",
+        "embedding_dim": 1024,
+        "disk": {"enabled": False}
     },
     "worker": {
         "batch_size": 10,
+        "max_wait_ms": 5,
         "max_queue_size": 1000,
-        "processing_timeout": 30
+        "aging_rate": 1.0,
+        "priority_weights": {"high": 3.0, "medium": 2.0, "low": 1.0},
+        "length_window": 40,
+        "max_bucket_delay_ms": 100,
+        "processing_timeout": 30,
+        "inference_concurrency": 1,
+        "max_encode_batch_size": 64,
+        "prefetch_batches": 2,
+        "chunk_overlap_tokens": 64
     },
     "api": {
         "max_text_length": 10000,
+        "max_batch_size": 256,
         "rate_limit": 100  # requests per minute
     }
 }
@@ -0,0 +1,27 @@
+from typing import List, Optional
+
+# Mixed lengths and languages, for benchmarks run without a corpus file
+SAMPLE_CORPUS = [
+    "How do I reset my password?",
+    "The quick brown fox jumps over the lazy dog.",
+    "Represent this sentence for searching relevant passages: best hiking trails near Seattle",
+    "Embeddings map text to dense vectors so that similar meanings end up close together.",
+    "Quarterly revenue grew 12% year over year, driven by subscription renewals in Europe.",
+    "import numpy as np; x = np.arange(10).reshape(2, 5)",
+    "Der schnelle braune Fuchs springt über den faulen Hund.",
+    "Symptoms include fever, dry cough and fatigue lasting more than a week.",
+    "Please find attached the signed contract and the updated delivery schedule for Q3.",
+    "ok",
+    " ".join(["Long documents are truncated to the model's maximum sequence length."] * 40),
+    "A transformer encoder reads the whole input at once and attends over every token pair, "
+    "which is why its cost grows with the square of the sequence length."
+]
+
+def load_corpus(path: Optional[str], repeat: int = 1) -> List[str]:
+    """Lines of a text file (or the built-in sample corpus), repeated for steadier timings"""
+    if path is None:
+        texts = SAMPLE_CORPUS
+    else:
+        with open(path, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+    return texts * repeat
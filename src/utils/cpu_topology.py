@@ -0,0 +1,160 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+import math
+import os
+
+from src.utils.logger import get_logger
+
+# Intra-op threads per process, set by the server from its CPU plan and
+# read by runtimes that size their own pools, like ONNX Runtime
+INTRA_OP_THREADS_ENV = "INTRA_OP_THREADS"
+
+def planned_threads() -> int:
+    """Intra-op threads the CPU plan gave this process, or 0 when there is no plan"""
+    try:
+        return max(0, int(os.getenv(INTRA_OP_THREADS_ENV, "0")))
+    except ValueError:
+        return 0
+
+def available_cpus() -> List[int]:
+    """Logical CPUs this process may run on, honouring taskset and cpuset limits"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def cgroup_cpu_limit() -> Optional[float]:
+    """CPUs granted by the cgroup CFS quota (e.g. docker --cpus), or None when unlimited"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max", encoding="ascii") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", encoding="ascii") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us", encoding="ascii") as f:
+            period = int(f.read())
+    except (OSError, ValueError):
+        return None
+    return quota / period if quota > 0 and period > 0 else None
+
+def _cpuinfo_cores() -> Dict[int, Tuple[int, int]]:
+    cores = {}
+    cpu = package = None
+    try:
+        with open("/proc/cpuinfo", encoding="ascii", errors="replace") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                key = key.strip()
+                if key == "processor":
+                    cpu, package = int(value), 0
+                elif key == "physical id":
+                    package = int(value)
+                elif key == "core id" and cpu is not None:
+                    cores[cpu] = (package, int(value))
+    except (OSError, ValueError):
+        return {}
+    return cores
+
+def physical_cores(cpus: Sequence[int]) -> List[List[int]]:
+    """Group logical CPUs into physical cores, each listed with its SMT siblings.
+
+    Reads /sys/devices/system/cpu/cpuN/topology and falls back to
+    /proc/cpuinfo; when neither is readable every logical CPU counts as
+    its own core.
+    """
+    cpuinfo = None
+    groups: Dict[Tuple[int, int], List[int]] = {}
+    for cpu in cpus:
+        topology = f"/sys/devices/system/cpu/cpu{cpu}/topology"
+        try:
+            with open(f"{topology}/physical_package_id", encoding="ascii") as f:
+                package = int(f.read())
+            with open(f"{topology}/core_id", encoding="ascii") as f:
+                key = (package, int(f.read()))
+        except (OSError, ValueError):
+            if cpuinfo is None:
+                cpuinfo = _cpuinfo_cores()
+            key = cpuinfo.get(cpu, (-1, cpu))
+        groups.setdefault(key, []).append(cpu)
+    return sorted(groups.values())
+
+class CpuPlan:
+    """How many worker processes to run, with how many intra-op threads each.
+
+    Inference is compute bound, so the budget is one thread per physical
+    core: SMT siblings share the same vector units and add little. The
+    budget is further capped by the cgroup CPU quota. Each worker is given
+    a disjoint set of whole cores to pin to, so workers do not migrate
+    between cores or fight over the same caches.
+    """
+
+    def __init__(self, cores: List[List[int]], budget: int, workers: int, threads: int, quota: Optional[float]):
+        self.cores = cores
+        self.budget = budget
+        self.workers = workers
+        self.threads = threads
+        self.quota = quota
+
+    def worker_cpus(self, index: int) -> List[int]:
+        """Logical CPUs for a worker: its share of the physical cores with their siblings"""
+        if self.workers * self.threads > len(self.cores):
+            # Oversubscribed: pinning would stack workers on the same cores
+            return [cpu for core in self.cores for cpu in core]
+        start = index * self.threads
+        return [cpu for core in self.cores[start:start + self.threads] for cpu in core]
+
+    def describe(self) -> str:
+        logical = sum(len(core) for core in self.cores)
+        quota = f"{self.quota:g} CPUs" if self.quota else "none"
+        lines = [
+            f"Logical CPUs available: {logical}, physical cores: {len(self.cores)}, cgroup quota: {quota}",
+            f"Thread budget: {self.budget}; plan: {self.workers} workers x {self.threads} intra-op threads"
+        ]
+        for index in range(self.workers):
+            lines.append(f"  worker {index}: cpus {','.join(map(str, self.worker_cpus(index)))}")
+        return "\n".join(lines)
+
+def plan_cpus(workers: Optional[int] = None, threads: Optional[int] = None) -> CpuPlan:
+    """Plan workers x intra-op threads for the CPUs this process can actually use.
+
+    With neither given, workers get up to 4 threads each, which keeps
+    per-request latency low while still filling the machine. Given one, the
+    other is derived from the budget; given both, they are used as is.
+    """
+    cores = physical_cores(available_cpus())
+    quota = cgroup_cpu_limit()
+    budget = len(cores)
+    if quota:
+        budget = min(budget, max(1, math.floor(quota)))
+
+    if workers is None and threads is None:
+        threads = min(4, budget)
+    if workers is None:
+        workers = max(1, budget // threads)
+    if threads is None:
+        threads = max(1, budget // workers)
+    return CpuPlan(cores, budget, max(1, workers), max(1, threads), quota)
+
+def pin_process(cpus: Sequence[int], threads: int):
+    """Restrict the current process to cpus and size its intra-op thread pools"""
+    logger = get_logger()
+    if cpus and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cpus)
+        except OSError as e:
+            logger.warning(f"Could not set CPU affinity to {list(cpus)}: {str(e)}")
+
+    # Read by OpenMP/MKL and ONNX Runtime pools not yet started in this process
+    for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", INTRA_OP_THREADS_ENV):
+        os.environ[name] = str(threads)
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    logger.info(f"Process {os.getpid()} pinned to cpus {','.join(map(str, cpus))} with {threads} threads")
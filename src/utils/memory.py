@@ -0,0 +1,24 @@
+from typing import Dict
+
+def process_memory(pid: str = "self") -> Dict[str, float]:
+    """Memory of a process in MB from /proc: RSS, PSS and its shared and private parts.
+
+    PSS splits each shared page evenly between the processes mapping it, so
+    summing PSS over the workers gives their real combined footprint. Returns
+    an empty dict where /proc/<pid>/smaps_rollup is unavailable.
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    except OSError:
+        return {}
+    return {
+        "rss_mb": fields.get("Rss", 0.0),
+        "pss_mb": fields.get("Pss", 0.0),
+        "shared_mb": fields.get("Shared_Clean", 0.0) + fields.get("Shared_Dirty", 0.0),
+        "private_mb": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0)
+    }
@@ -0,0 +1,120 @@
+from typing import Callable, Dict, Optional, Sequence
+import gc
+import os
+import signal
+import socket
+import uvicorn
+
+from src.utils.logger import get_logger
+from src.utils.memory import process_memory
+
+def _bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+def serve_prefork(
+    config_kwargs: dict,
+    workers: int,
+    preload: Callable[[], None],
+    helpers: Sequence[Callable[[], None]] = (),
+    worker_init: Optional[Callable[[int], None]] = None
+) -> int:
+    """Run uvicorn workers forked from a parent that has already loaded the model.
+
+    The parent binds the listening socket, calls `preload` to load model
+    weights, then forks `workers` children that each serve the app on the
+    inherited socket. Weight tensors are never written after loading, so
+    their pages stay shared copy-on-write and an extra worker costs its own
+    Python heap and activations rather than another copy of the model. The
+    parent runs no inference before forking, because thread pools started
+    by the runtime do not survive fork. ONNX Runtime starts its pool when a
+    session is built, so the onnx backends build their session on first use
+    in each process instead; for them preloading only shares the tokenizer
+    and the one-off export, not the weights. The parent forwards SIGINT and
+    SIGTERM to the workers and exits once they have all stopped.
+
+    Each of `helpers` runs in its own forked process started before the
+    workers, and `worker_init(index)` runs in each worker before it serves.
+    Helpers are expected to run until shutdown: if one exits early, the
+    workers depending on it are stopped and the launcher fails. Returns the
+    exit status for the launcher.
+    """
+    logger = get_logger()
+    sock = _bind(config_kwargs["host"], config_kwargs["port"])
+
+    preload()
+    # Move everything allocated so far out of the collector's reach, so GC
+    # passes in the workers do not write to (and so copy) shared pages
+    gc.collect()
+    gc.freeze()
+    parent_memory = process_memory()
+    logger.info(
+        f"Preloaded weights in parent: RSS {parent_memory.get('rss_mb', 0.0):.0f} MB; "
+        f"forking {workers} workers"
+    )
+
+    children: Dict[int, str] = {}
+    for index, helper in enumerate(helpers):
+        pid = os.fork()
+        if pid == 0:
+            sock.close()
+            code = 0
+            try:
+                helper()
+            except BaseException as e:
+                logger.error(f"Helper {index} failed: {str(e)}")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = f"Helper {index}"
+    helper_pids = set(children)
+
+    for index in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                if worker_init is not None:
+                    worker_init(index)
+                server = uvicorn.Server(uvicorn.Config(**config_kwargs, workers=1))
+                server.run(sockets=[sock])
+            finally:
+                os._exit(0)
+        children[pid] = f"Worker {index}"
+
+    stopping = False
+    exit_code = 0
+
+    def forward(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, forward)
+    signal.signal(signal.SIGTERM, forward)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        name = children.pop(pid, "Process")
+        code = os.waitstatus_to_exitcode(status)
+        logger.info(f"{name} (pid {pid}) exited with status {code}")
+        if pid in helper_pids and not stopping:
+            # Workers would otherwise keep accepting requests nothing can answer
+            logger.error(f"{name} exited unexpectedly; stopping the workers")
+            exit_code = 1
+            forward(signal.SIGTERM, None)
+    sock.close()
+    return exit_code
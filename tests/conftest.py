@@ -0,0 +1,61 @@
+from contextlib import asynccontextmanager
+from typing import List
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.services.backends import FakeBackend
+
+class CountingBackend(FakeBackend):
+    """FakeBackend that records the texts of every forward pass"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls: List[List[str]] = []
+
+    def forward(self, features: List[str]) -> np.ndarray:
+        self.calls.append(list(features))
+        return super().forward(features)
+
+class FakeClock:
+    """Stand-in for a module's `time` with a clock the test moves by hand"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+@pytest.fixture
+def backend() -> CountingBackend:
+    return CountingBackend("fake", dimension=32, max_seq_length=128)
+
+@pytest.fixture
+def client(monkeypatch) -> TestClient:
+    """The service's routers with the default model served by FakeBackend"""
+    from src.api.routes import embedding_routes, openai_routes
+
+    registry = embedding_routes.model_registry
+    monkeypatch.setitem(registry.model_configs, registry.default_model, {
+        "backend": "fake",
+        "fake": {"dimension": 32, "max_seq_length": 128}
+    })
+    monkeypatch.setattr(registry, "warmup_lengths", [])
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        await registry.close()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(embedding_routes.router)
+    app.include_router(openai_routes.router)
+    with TestClient(app) as client:
+        yield client
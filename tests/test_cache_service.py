@@ -0,0 +1,33 @@
+import asyncio
+import numpy as np
+
+from src.services.cache_backends import MemoryCacheBackend
+from src.services.cache_service import CacheService, build_cache_key
+from src.utils.constants import CACHE_KEY_PREFIX
+
+def _vector(seed: int, dim: int = 8) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+def test_keys_are_fixed_size_digests():
+    short = build_cache_key("hi", "model")
+    long = build_cache_key("word " * 10000, "model")
+    assert short.startswith(CACHE_KEY_PREFIX)
+    assert len(short) == len(long) == len(CACHE_KEY_PREFIX) + 32
+
+def test_keys_normalize_text_and_separate_models_and_options():
+    service = CacheService(namespace="model")
+    # NFC and NFD spellings of the same text, with trailing whitespace
+    assert service.key_for("cafe\u0301 ") == service.key_for("caf\u00e9")
+    assert service.key_for("text") != service.key_for("text", truncate=False)
+    assert service.key_for("text") != CacheService(namespace="other").key_for("text")
+
+def test_round_trip_through_the_service():
+    async def run():
+        service = CacheService(MemoryCacheBackend(max_size=4), namespace="model")
+        await service.set_many(["a", "b"], [_vector(1), _vector(2)])
+        found = await service.get_many(["b", "missing", "a"])
+        np.testing.assert_array_equal(found[0], _vector(2))
+        assert found[1] is None
+        np.testing.assert_array_equal(await service.get("a "), _vector(1))
+
+    asyncio.run(run())
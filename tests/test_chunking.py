@@ -0,0 +1,26 @@
+from src.services.backends.fake import FakeTokenizer
+from src.services.chunking import split_into_chunks
+
+tokenizer = FakeTokenizer()
+document = " ".join(f"w{i}" for i in range(20))
+
+def test_short_texts_are_a_single_chunk():
+    assert split_into_chunks(tokenizer, ["a few words", ""], window=10, overlap=4) == [
+        [(0, 11, 3)],
+        [(0, 0, 1)]
+    ]
+
+def test_long_texts_are_cut_into_overlapping_windows_at_token_boundaries():
+    [spans] = split_into_chunks(tokenizer, [document], window=10, overlap=4)
+    words = document.split()
+    assert [document[start:end].split() for start, end, _ in spans] == [
+        words[0:10], words[6:16], words[12:20]
+    ]
+    assert [tokens for _, _, tokens in spans] == [10, 10, 8]
+
+def test_overlap_is_capped_at_half_the_window():
+    [spans] = split_into_chunks(tokenizer, [document], window=10, overlap=10)
+    words = document.split()
+    assert [document[start:end].split() for start, end, _ in spans] == [
+        words[0:10], words[5:15], words[10:20]
+    ]
@@ -0,0 +1,124 @@
+import asyncio
+import numpy as np
+import pytest
+
+from src.services.cache_backends import disk
+from src.services.cache_backends.disk import DiskCacheBackend
+from src.services.cache_backends.memory import MemoryCacheBackend
+from src.services.cache_service import CacheService
+from tests.conftest import FakeClock
+
+def _vector(seed: int, dim: int = 8) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(disk, "time", clock)
+    return clock
+
+def test_entries_survive_a_restart(tmp_path, clock):
+    async def run():
+        cache = DiskCacheBackend(str(tmp_path), namespace="model@main")
+        await cache.set_many(["a", "b"], [_vector(1), _vector(2)])
+        await cache.close()
+
+        reopened = DiskCacheBackend(str(tmp_path), namespace="model@main")
+        other_revision = DiskCacheBackend(str(tmp_path), namespace="model@v2")
+        try:
+            found = await reopened.get_many(["a", "b", "c"])
+            np.testing.assert_array_equal(found[0], _vector(1))
+            np.testing.assert_array_equal(found[1], _vector(2))
+            assert found[2] is None
+            assert await other_revision.get("a") is None
+            assert reopened.path != other_revision.path
+        finally:
+            await reopened.close()
+            await other_revision.close()
+
+    asyncio.run(run())
+
+def test_dtype_is_fixed_when_the_file_is_created(tmp_path, clock):
+    async def run():
+        cache = DiskCacheBackend(str(tmp_path), namespace="model", dtype="float16")
+        await cache.set("a", _vector(1))
+        await cache.close()
+
+        reopened = DiskCacheBackend(str(tmp_path), namespace="model", dtype="float32")
+        try:
+            assert reopened.dtype == np.float16
+            stored = await reopened.get("a")
+            assert stored.dtype == np.float32
+            np.testing.assert_allclose(stored, _vector(1), atol=1e-2)
+        finally:
+            await reopened.close()
+
+    asyncio.run(run())
+
+def test_compaction_keeps_the_most_recently_accessed(tmp_path, clock):
+    async def run():
+        cache = DiskCacheBackend(str(tmp_path), max_entries=2, compact_every=1000)
+        try:
+            for i in range(4):
+                await cache.set(f"key-{i}", _vector(i))
+                clock.advance(1)
+            # Reading key-0 makes it the most recent; key-1 and key-2 are now the oldest
+            assert await cache.get("key-0") is not None
+            await cache.compact()
+
+            found = await cache.get_many([f"key-{i}" for i in range(4)])
+            assert [vector is not None for vector in found] == [True, False, False, True]
+            assert cache.stats()["evictions"] == 2
+        finally:
+            await cache.close()
+
+    asyncio.run(run())
+
+def test_writes_trigger_compaction(tmp_path, clock):
+    async def run():
+        cache = DiskCacheBackend(str(tmp_path), max_entries=3, compact_every=5)
+        try:
+            for i in range(5):
+                await cache.set(f"key-{i}", _vector(i))
+                clock.advance(1)
+            assert cache.stats()["evictions"] == 2
+        finally:
+            await cache.close()
+
+    asyncio.run(run())
+
+def test_expired_entries_are_skipped_and_compacted(tmp_path, clock):
+    async def run():
+        cache = DiskCacheBackend(str(tmp_path), ttl=60)
+        try:
+            await cache.set("old", _vector(1))
+            clock.advance(30)
+            await cache.set("new", _vector(2))
+            clock.advance(31)
+
+            assert await cache.get("old") is None
+            assert await cache.get("new") is not None
+            await cache.compact()
+            count = cache._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            assert count == 1
+        finally:
+            await cache.close()
+
+    asyncio.run(run())
+
+def test_l2_hits_are_promoted_into_l1(tmp_path, clock):
+    async def run():
+        l2 = DiskCacheBackend(str(tmp_path), namespace="model")
+        service = CacheService(MemoryCacheBackend(max_size=4), namespace="model", l2=l2)
+        try:
+            await l2.set(service.key_for("warm"), _vector(1))
+
+            found = await service.get_many(["warm", "cold"])
+            np.testing.assert_array_equal(found[0], _vector(1))
+            assert found[1] is None
+            assert await service.backend.get(service.key_for("warm")) is not None
+            assert service.stats()["l2"]["backend"] == "disk"
+        finally:
+            await service.close()
+
+    asyncio.run(run())
@@ -0,0 +1,105 @@
+import asyncio
+import numpy as np
+import pytest
+
+from src.services.cache_backends import memory
+from src.services.cache_backends.memory import MemoryCacheBackend
+from tests.conftest import FakeClock
+
+def _vector(seed: int, dim: int = 8) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(memory, "time", clock)
+    return clock
+
+def test_evicts_least_recently_used(clock):
+    async def run():
+        cache = MemoryCacheBackend(max_size=2, ttl=60)
+        await cache.set("a", _vector(1))
+        await cache.set("b", _vector(2))
+        assert await cache.get("a") is not None
+        await cache.set("c", _vector(3))
+
+        assert await cache.get("b") is None
+        np.testing.assert_array_equal(await cache.get("a"), _vector(1))
+        np.testing.assert_array_equal(await cache.get("c"), _vector(3))
+        assert cache.stats()["evictions"] == 1
+
+    asyncio.run(run())
+
+def test_expires_entries_after_ttl(clock):
+    async def run():
+        cache = MemoryCacheBackend(max_size=4, ttl=60)
+        await cache.set("a", _vector(1))
+        clock.advance(30)
+        await cache.set("b", _vector(2))
+        clock.advance(31)
+
+        assert await cache.get("a") is None
+        assert await cache.get("b") is not None
+        stats = cache.stats()
+        assert stats["expirations"] == 1
+        assert stats["size"] == 1
+
+    asyncio.run(run())
+
+def test_inserts_sweep_expired_entries(clock):
+    async def run():
+        cache = MemoryCacheBackend(max_size=8, ttl=60, sweep_batch=4)
+        for i in range(3):
+            await cache.set(f"old-{i}", _vector(i))
+        clock.advance(61)
+        await cache.set("new", _vector(9))
+
+        # Swept without ever being looked up
+        assert len(cache.cache) == 1
+        assert cache.stats()["expirations"] == 3
+
+    asyncio.run(run())
+
+def test_reuses_slab_slots(clock):
+    async def run():
+        cache = MemoryCacheBackend(max_size=2, ttl=60)
+        await cache.set("a", _vector(1))
+        await cache.set("b", _vector(2))
+        slab = cache._slab
+        assert slab.shape == (2, 8)
+
+        # Overwriting keeps the key's slot; an expired entry frees its slot
+        clock.advance(30)
+        await cache.set("a", _vector(3))
+        clock.advance(31)
+        assert await cache.get("b") is None
+        await cache.set("c", _vector(4))
+
+        assert cache._slab is slab
+        assert cache.stats()["evictions"] == 0
+        assert sorted(slot for slot, _ in cache.cache.values()) == [0, 1]
+        np.testing.assert_array_equal(await cache.get("a"), _vector(3))
+        np.testing.assert_array_equal(await cache.get("c"), _vector(4))
+
+    asyncio.run(run())
+
+def test_float16_storage_halves_the_slab(clock):
+    async def run():
+        cache = MemoryCacheBackend(max_size=4, dtype="float16")
+        await cache.set("a", _vector(1))
+        stored = await cache.get("a")
+
+        assert cache.stats()["slab_bytes"] == 4 * 8 * 2
+        assert stored.dtype == np.float32
+        np.testing.assert_allclose(stored, _vector(1), atol=1e-2)
+
+    asyncio.run(run())
+
+def test_rejects_other_dimensions(clock):
+    async def run():
+        cache = MemoryCacheBackend(max_size=2)
+        await cache.set("a", _vector(1, dim=8))
+        with pytest.raises(ValueError):
+            await cache.set("b", _vector(2, dim=4))
+
+    asyncio.run(run())
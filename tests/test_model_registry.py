@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+
+from src.services.cache_service import CacheService
+from src.services.model_registry import ModelRegistry
+from src.services.request_tracker import RequestTracker
+from src.services.worker import WorkerService
+
+def _registry(names, memory_budget_mb: float = 250) -> ModelRegistry:
+    configs = {
+        name: {"backend": "fake", "fake": {"dimension": 8, "max_seq_length": 32}, "memory_mb": 100}
+        for name in names
+    }
+
+    def worker_factory(name, settings, backend):
+        return WorkerService(CacheService(namespace=name), RequestTracker(), backend)
+
+    return ModelRegistry(configs, names[0], worker_factory, memory_budget_mb=memory_budget_mb)
+
+def test_models_load_once_on_first_use():
+    async def run():
+        registry = _registry(["a", "b"])
+        try:
+            worker = await registry.get()
+            assert await registry.get("a") is worker
+            assert registry.loads == 1 and list(registry.workers) == ["a"]
+            with pytest.raises(KeyError):
+                await registry.get("missing")
+        finally:
+            await registry.close()
+
+    asyncio.run(run())
+
+def test_least_recently_used_idle_model_is_evicted_over_budget():
+    async def run():
+        registry = _registry(["a", "b", "c"])
+        try:
+            await registry.get("a")
+            await registry.get("b")
+            await registry.get("a")
+            await registry.get("c")
+            assert list(registry.workers) == ["a", "c"]
+            assert registry.evictions == 1
+            assert registry.stats()["memory_mb"] == 200
+        finally:
+            await registry.close()
+
+    asyncio.run(run())
+
+def test_models_in_use_are_not_evicted():
+    async def run():
+        registry = _registry(["a", "b", "c"], memory_budget_mb=150)
+        try:
+            async with registry.use("a"):
+                await registry.get("b")
+                assert list(registry.workers) == ["a", "b"]
+                await registry.get("c")
+                assert list(registry.workers) == ["a", "c"]
+            await registry.get("b")
+            assert list(registry.workers) == ["b"]
+        finally:
+            await registry.close()
+
+    asyncio.run(run())
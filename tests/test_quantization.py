@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from src.services.quantization import (
+    apply_output_options,
+    quantize,
+    truncate_dimensions,
+    validate_output_options
+)
+
+def test_truncation_renormalizes_to_unit_length():
+    embeddings = np.array([[3.0, 4.0, 12.0], [0.0, 2.0, 1.0]], dtype=np.float32)
+    truncated = truncate_dimensions(embeddings, 2)
+    np.testing.assert_allclose(truncated, [[0.6, 0.8], [0.0, 1.0]], rtol=1e-6)
+    np.testing.assert_array_equal(truncate_dimensions(embeddings, None), embeddings)
+    np.testing.assert_array_equal(truncate_dimensions(embeddings, 3), embeddings)
+
+def test_int8_scales_each_vector_by_its_own_maximum():
+    embeddings = np.array([[0.5, -0.25, 0.0], [0.01, 0.02, -0.04]], dtype=np.float32)
+    codes = quantize(embeddings, "int8")
+    assert codes.dtype == np.int8
+    np.testing.assert_array_equal(codes, [[127, -64, 0], [32, 64, -127]])
+    # The same vector quantizes the same way in any batch
+    np.testing.assert_array_equal(quantize(embeddings[1:], "int8"), codes[1:])
+
+def test_ubinary_packs_signs_eight_per_byte():
+    embeddings = np.array([[1, -1, 1, 1, -1, -1, -1, 1, 0.5, -0.5, 0, 0, 0, 0, 0, 0.1]], dtype=np.float32)
+    codes = quantize(embeddings, "ubinary")
+    assert codes.dtype == np.uint8
+    np.testing.assert_array_equal(codes, [[0b10110001, 0b10000001]])
+
+def test_output_options_truncate_before_quantizing():
+    embeddings = np.array([[0.1, -0.2, 0.3, 0.4, 9.0]], dtype=np.float32)
+    np.testing.assert_array_equal(apply_output_options(embeddings, 4, "int8"), [[32, -64, 95, 127]])
+
+@pytest.mark.parametrize("dimensions, encoding, error", [
+    (None, "float32", None),
+    (16, "ubinary", None),
+    (33, "float32", "dimensions must be between 1 and 32"),
+    (12, "ubinary", "dimensions must be a multiple of 8 for ubinary encoding"),
+    (None, "float16", "encoding must be one of float32, int8, ubinary")
+])
+def test_validate_output_options(dimensions, encoding, error):
+    assert validate_output_options(32, dimensions, encoding) == error
@@ -0,0 +1,69 @@
+import asyncio
+import numpy as np
+import pytest
+
+from src.services.cache_backends.memory import MemoryCacheBackend
+from src.services.cache_backends.redis_backend import RedisCacheBackend
+from src.services.cache_service import CacheService
+
+fakeredis = pytest.importorskip("fakeredis")
+
+def _vector(seed: int, dim: int = 8) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+def test_batches_take_one_round_trip_each():
+    async def run():
+        client = fakeredis.FakeAsyncRedis()
+        cache = RedisCacheBackend(ttl=60, client=client)
+
+        await cache.set_many(["a", "b"], [_vector(1), _vector(2)])
+        found = await cache.get_many(["a", "b", "c"])
+        np.testing.assert_array_equal(found[0], _vector(1))
+        np.testing.assert_array_equal(found[1], _vector(2))
+        assert found[2] is None
+
+        stats = cache.stats()
+        assert stats["round_trips"] == 2
+        assert (stats["hits"], stats["misses"]) == (2, 1)
+        assert 0 < await client.ttl("a") <= 60
+        await cache.close()
+
+    asyncio.run(run())
+
+def test_namespaces_isolate_model_revisions():
+    async def run():
+        client = fakeredis.FakeAsyncRedis()
+        current = RedisCacheBackend(client=client, namespace="model:fake@v2")
+        previous = RedisCacheBackend(client=client, namespace="model:fake@v1")
+
+        await current.set("a", _vector(1))
+        assert await previous.get("a") is None
+        assert await client.exists("model:fake@v2|a")
+        await current.close()
+
+    asyncio.run(run())
+
+def test_l2_misses_fall_back_and_hits_are_promoted():
+    async def run():
+        l2 = RedisCacheBackend(client=fakeredis.FakeAsyncRedis())
+        service = CacheService(MemoryCacheBackend(max_size=4), namespace="model", l2=l2)
+        await service.set_many(["a"], [_vector(1)])
+
+        # A new process: empty L1, shared L2
+        fresh = CacheService(MemoryCacheBackend(max_size=4), namespace="model", l2=l2)
+        np.testing.assert_array_equal((await fresh.get_many(["a"]))[0], _vector(1))
+        assert await fresh.backend.get(fresh.key_for("a")) is not None
+        await service.close()
+
+    asyncio.run(run())
+
+def test_an_unreachable_l2_only_costs_misses():
+    async def run():
+        client = fakeredis.FakeAsyncRedis(connected=False)
+        service = CacheService(MemoryCacheBackend(max_size=4), namespace="model", l2=RedisCacheBackend(client=client))
+
+        await service.set_many(["a"], [_vector(1)])
+        assert (await service.get_many(["a", "b"]))[1] is None
+        np.testing.assert_array_equal(await service.get("a"), _vector(1))
+
+    asyncio.run(run())
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import numpy as np
+import pytest
+
+from src.services.remote_inference import InferenceRing, InputTooLargeError, RingClient, serve_inference
+
+def _serve(backend, **ring_kwargs) -> InferenceRing:
+    """A ring with its inference loop running on a daemon thread"""
+    ring = InferenceRing(workers=2, dimension=backend.dimension, **ring_kwargs)
+    threading.Thread(target=serve_inference, args=(ring, backend), daemon=True).start()
+    return ring
+
+def test_round_trip_matches_direct_encoding(backend):
+    ring = _serve(backend)
+    texts = ["hello world", "naïve café", "東京の天気は晴れ", "emoji 🚀 text", ""]
+
+    async def run():
+        client = RingClient(ring, 0, backend.model_name)
+        vectors = await client.encode(texts)
+        np.testing.assert_allclose(vectors, backend.encode(texts))
+        assert client.stats()["requests"] == 1
+
+    asyncio.run(run())
+
+def test_workers_get_their_own_results(backend):
+    ring = _serve(backend)
+
+    async def run():
+        clients = [RingClient(ring, worker, backend.model_name) for worker in range(2)]
+        first, second = await asyncio.gather(clients[0].encode(["one"]), clients[1].encode(["two"]))
+        np.testing.assert_allclose(first, backend.encode(["one"]))
+        np.testing.assert_allclose(second, backend.encode(["two"]))
+
+    asyncio.run(run())
+
+def test_multibyte_texts_are_split_across_slots_not_clipped(backend):
+    # Each text is 30 characters but 90 UTF-8 bytes, so only one fits a slot
+    ring = _serve(backend, slot_texts=4, slot_bytes=128)
+    texts = [f"{i}" + "語" * 29 for i in range(6)]
+
+    async def run():
+        client = RingClient(ring, 0, backend.model_name)
+        vectors = await client.encode(texts)
+        assert len({vector.tobytes() for vector in vectors}) == len(texts)
+        np.testing.assert_allclose(vectors, backend.encode(texts))
+        assert client.stats()["requests"] == len(texts)
+
+    asyncio.run(run())
+
+def test_batches_larger_than_a_slot_are_split(backend):
+    ring = _serve(backend, slot_texts=2)
+    texts = [f"text {i}" for i in range(5)]
+
+    async def run():
+        client = RingClient(ring, 1, backend.model_name)
+        np.testing.assert_allclose(await client.encode(texts), backend.encode(texts))
+        assert client.stats()["requests"] == 3
+
+    asyncio.run(run())
+
+def test_oversized_texts_are_rejected(backend):
+    ring = InferenceRing(workers=1, dimension=backend.dimension, slot_bytes=64)
+    client = RingClient(ring, 0, backend.model_name, max_text_length=40)
+
+    with pytest.raises(InputTooLargeError):
+        client._split(["x" * 41])
+    # 21 characters, but 84 bytes of UTF-8
+    with pytest.raises(InputTooLargeError):
+        client._split(["🚀" * 21])
+    assert client._split(["🚀" * 16]) == [["🚀".encode("utf-8") * 16]]
+
+def test_unreadable_slot_fails_only_its_request(backend):
+    ring = _serve(backend)
+
+    async def run():
+        client = RingClient(ring, 0, backend.model_name)
+        with pytest.raises(RuntimeError, match="Unreadable request"):
+            await client._request([b"\xff\xfe"])
+        np.testing.assert_allclose(await client.encode(["still works"]), backend.encode(["still works"]))
+
+    asyncio.run(run())
+
+def test_requests_time_out_when_nothing_serves_the_ring(backend):
+    ring = InferenceRing(workers=1, dimension=backend.dimension)
+
+    async def run():
+        client = RingClient(ring, 0, backend.model_name, request_timeout=0.05)
+        with pytest.raises(RuntimeError, match="did not answer"):
+            await client.encode(["anyone there"])
+        assert client.stats()["timeouts"] == 1
+
+    asyncio.run(run())
@@ -0,0 +1,107 @@
+import asyncio
+import numpy as np
+import pytest
+
+from src.models.pydantic_models import Priority
+from src.services import request_tracker
+from src.services.request_tracker import RequestTracker
+from tests.conftest import FakeClock
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(request_tracker, "time", clock)
+    return clock
+
+def test_queue_positions_follow_each_lane(clock):
+    async def run():
+        tracker = RequestTracker()
+        for request_id in ("a", "b", "c"):
+            await tracker.update_queue_position(request_id, Priority.LOW, "model")
+        await tracker.update_queue_position("other", Priority.HIGH, "model")
+
+        positions = [(await tracker.get_status(r)).queue_position for r in ("a", "b", "c", "other")]
+        assert positions == [1, 2, 3, 1]
+
+        await tracker.start_request("a", Priority.LOW, "model")
+        assert (await tracker.get_status("a")).queue_position is None
+        assert (await tracker.get_status("b")).queue_position == 1
+        assert (await tracker.get_status("c")).queue_position == 2
+        assert (await tracker.get_status("other")).queue_position == 1
+
+    asyncio.run(run())
+
+def test_queue_positions_stay_exact_when_requests_start_out_of_order(clock):
+    async def run():
+        tracker = RequestTracker()
+        for request_id in ("a", "b", "c", "d"):
+            await tracker.update_queue_position(request_id)
+
+        async def positions():
+            return [(await tracker.get_status(r)).queue_position for r in ("a", "b", "c", "d")]
+
+        # Length grouping can take a later request first
+        await tracker.start_request("c")
+        assert await positions() == [1, 2, None, 3]
+        await tracker.start_request("a")
+        assert await positions() == [None, 1, None, 2]
+        await tracker.start_request("b")
+        assert await positions() == [None, None, None, 1]
+        # Starting twice does not move anyone up again
+        await tracker.start_request("b")
+        assert await positions() == [None, None, None, 1]
+
+    asyncio.run(run())
+
+def test_entries_expire_after_ttl(clock):
+    async def run():
+        tracker = RequestTracker(ttl=60)
+        await tracker.update_queue_position("old")
+        clock.advance(30)
+        await tracker.update_queue_position("new")
+        clock.advance(31)
+
+        assert await tracker.get_status("old") is None
+        assert (await tracker.get_status("new")).status == "pending"
+        assert tracker.stats()["expirations"] == 1
+
+        # Any change restarts an entry's ttl
+        clock.advance(20)
+        await tracker.complete_request("new", np.ones(4), False)
+        clock.advance(50)
+        assert (await tracker.get_status("new")).status == "completed"
+
+    asyncio.run(run())
+
+def test_oldest_entries_are_evicted_beyond_max_size(clock):
+    async def run():
+        tracker = RequestTracker(max_size=2)
+        for request_id in ("a", "b", "c"):
+            await tracker.update_queue_position(request_id)
+        assert await tracker.get_status("a") is None
+        assert tracker.stats()["evictions"] == 1
+
+        # Starting an evicted request still moves the ones behind it up
+        await tracker.start_request("a")
+        assert (await tracker.get_status("b")).queue_position == 1
+
+    asyncio.run(run())
+
+def test_results_are_returned_once(clock):
+    async def run():
+        tracker = RequestTracker()
+        await tracker.update_queue_position("ok")
+        await tracker.update_queue_position("bad")
+        assert (await tracker.get_result_payload("ok"))["error"] == "Result not ready"
+
+        await tracker.complete_request("ok", [0.5, 0.25], True)
+        await tracker.fail_request("bad", "boom")
+        result = await tracker.get_result_payload("ok")
+        assert result["embedding"].dtype == np.float32
+        assert result["cache_hit"] is True
+        assert (await tracker.get_result_payload("bad"))["error"] == "boom"
+
+        assert await tracker.get_result_payload("ok") is None
+        assert await tracker.get_status("bad") is None
+
+    asyncio.run(run())
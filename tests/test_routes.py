@@ -0,0 +1,151 @@
+import asyncio
+import base64
+import json
+import time
+import msgpack
+import numpy as np
+
+from src.api.responses import BINARY_HEADER, BINARY_MAGIC
+from src.api.routes import embedding_routes
+from src.services.backends import FakeBackend
+from src.services.quantization import quantize, truncate_dimensions
+
+# Matches the backend the client fixture serves
+reference = FakeBackend(dimension=32, max_seq_length=128)
+
+def test_embed_batch_deduplicates_and_reports_cache_hits(client):
+    texts = ["alpha", "beta", "alpha"]
+    response = client.post("/embed_batch", json={"texts": texts})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["unique_texts"] == 2
+    assert body["cache_hits"] == 0
+    assert [item["index"] for item in body["embeddings"]] == [0, 1, 2]
+    vectors = np.array([item["embedding"] for item in body["embeddings"]])
+    np.testing.assert_allclose(vectors, reference.encode(texts), rtol=1e-6)
+
+    body = client.post("/embed_batch", json={"texts": ["beta", "gamma"]}).json()
+    assert [item["cache_hit"] for item in body["embeddings"]] == [True, False]
+    assert body["cache_hits"] == 1
+
+def test_embed_batch_rejects_oversized_batches(client):
+    response = client.post("/embed_batch", json={"texts": ["x"] * 257})
+    assert response.status_code == 400
+    assert client.post("/embed_batch", json={"texts": []}).status_code == 422
+
+def test_unknown_models_are_not_found(client):
+    response = client.post("/embed_batch", json={"texts": ["x"], "model": "no-such-model"})
+    assert response.status_code == 404
+
+def test_openai_embeddings_base64_decodes_to_little_endian_float32(client):
+    texts = ["alpha", "beta"]
+    response = client.post("/v1/embeddings", json={"input": texts, "encoding_format": "base64"})
+    assert response.status_code == 200
+    body = response.json()
+    vectors = np.stack([
+        np.frombuffer(base64.b64decode(item["embedding"]), dtype="<f4") for item in body["data"]
+    ])
+    np.testing.assert_allclose(vectors, reference.encode(texts), rtol=1e-6)
+
+    floats = client.post("/v1/embeddings", json={"input": ["gamma"]}).json()
+    np.testing.assert_allclose(floats["data"][0]["embedding"], reference.encode(["gamma"])[0], rtol=1e-6)
+    assert floats["usage"]["prompt_tokens"] == floats["usage"]["total_tokens"] > 0
+
+def test_embed_batch_negotiates_binary_and_msgpack(client):
+    client.post("/embed_batch", json={"texts": ["alpha"]})
+
+    headers = {"Accept": "application/octet-stream"}
+    response = client.post("/embed_batch", json={"texts": ["alpha", "beta"]}, headers=headers)
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.headers["X-Cache-Hits"] == "1,0"
+    magic, version, dtype_code, _, rows, dim = BINARY_HEADER.unpack_from(response.content)
+    assert (magic, version, dtype_code, rows, dim) == (BINARY_MAGIC, 1, b"f", 2, 32)
+    matrix = np.frombuffer(response.content[BINARY_HEADER.size:], dtype="<f4").reshape(rows, dim)
+    np.testing.assert_allclose(matrix[1], reference.encode(["beta"])[0], rtol=1e-6)
+
+    texts = ["gamma", "delta"]
+    headers = {"Accept": "application/msgpack"}
+    response = client.post("/embed_batch", json={"texts": texts}, headers=headers)
+    assert response.headers["content-type"] == "application/msgpack"
+    body = msgpack.unpackb(response.content)
+    vectors = np.stack([np.frombuffer(item["embedding"], dtype="<f4") for item in body["embeddings"]])
+    np.testing.assert_allclose(vectors, reference.encode(texts), rtol=1e-6)
+
+    headers = {"Accept": "text/html, */*"}
+    response = client.post("/embed_batch", json={"texts": ["epsilon"]}, headers=headers)
+    assert response.headers["content-type"] == "application/json"
+    assert len(response.json()["embeddings"]) == 1
+
+def test_embed_stream_answers_every_line_in_order(client):
+    body = b"\n".join([
+        json.dumps({"id": "a", "text": "alpha"}).encode(),
+        b"not json",
+        b"",
+        json.dumps({"id": "b"}).encode(),
+        json.dumps({"text": "gamma"}).encode()
+    ])
+    response = client.post("/embed_stream", content=body, params={"dimensions": 8})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in response.text.splitlines()]
+
+    assert [record["id"] for record in records] == ["a", None, "b", 5]
+    assert records[1]["error"] == "Line 2 is not valid JSON"
+    assert records[2]["error"] == "Record has no 'text' string"
+    assert len(records[0]["embedding"]) == 8 and records[0]["cache_hit"] is False
+    assert "text" not in records[3]
+
+def test_embed_stream_rejects_bad_output_options_up_front(client):
+    response = client.post("/embed_stream", content=b"{}", params={"dimensions": 33})
+    assert response.status_code == 400
+
+def test_a_revision_bump_misses_the_shared_memory_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(embedding_routes, "cache_config", {
+        "backend": "shared_memory",
+        "max_size": 64,
+        "shared_memory": {"path": str(tmp_path / "cache")}
+    })
+    name = embedding_routes.model_name
+
+    async def run():
+        workers = [
+            embedding_routes._build_worker(name, {"revision": revision}, reference)
+            for revision in ("main", "main", "v2")
+        ]
+        try:
+            await workers[0].embed_many(["alpha"])
+            assert (await workers[1].embed_many(["alpha"]))[1] == [True]
+            assert (await workers[2].embed_many(["alpha"]))[1] == [False]
+        finally:
+            for worker in workers:
+                await worker.close()
+
+    asyncio.run(run())
+
+def test_cache_hits_return_the_vectors_a_miss_returned(client):
+    texts = ["alpha", "beta"]
+    miss = client.post("/v1/embeddings", json={"input": texts}).json()
+    hit = client.post("/v1/embeddings", json={"input": texts}).json()
+    assert [item["embedding"] for item in hit["data"]] == [item["embedding"] for item in miss["data"]]
+
+def _fetch_result(client, request_id: str) -> dict:
+    for _ in range(200):
+        result = client.get(f"/result/{request_id}").json()
+        if result["error"] != "Result not ready":
+            return result
+        time.sleep(0.01)
+    raise AssertionError("request did not finish")
+
+def test_submit_applies_output_options_to_the_result(client):
+    expected = quantize(truncate_dimensions(reference.encode(["alpha"]), 16), "int8")[0].tolist()
+    for _ in range(2):
+        # Queued first, then answered from the cache at submit time
+        submitted = client.post("/submit", json={"text": "alpha", "dimensions": 16, "encoding": "int8"}).json()
+        result = _fetch_result(client, submitted["request_id"])
+        assert result["embedding"] == expected
+
+    full = client.post("/submit", json={"text": "alpha"}).json()
+    assert len(_fetch_result(client, full["request_id"])["embedding"]) == 32
+
+    response = client.post("/submit", json={"text": "alpha", "dimensions": 12, "encoding": "ubinary"})
+    assert response.status_code == 400
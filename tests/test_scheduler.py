@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+
+from src.models.pydantic_models import Priority
+from src.services.scheduler import PriorityScheduler
+
+def _age(scheduler: PriorityScheduler, priority: Priority, seconds: float):
+    """Pretend every item queued at priority has waited seconds longer"""
+    queue = scheduler.queues[priority]
+    for position, (enqueued_at, length, item) in enumerate(queue):
+        queue[position] = (enqueued_at - seconds, length, item)
+
+def test_higher_priority_is_served_first():
+    async def run():
+        scheduler = PriorityScheduler()
+        scheduler.put("low", Priority.LOW)
+        scheduler.put("high", Priority.HIGH)
+        assert await scheduler.get_batch(1, 0) == ["high"]
+        assert await scheduler.get_batch(1, 0) == ["low"]
+
+    asyncio.run(run())
+
+def test_aging_lets_a_waiting_low_request_overtake_high():
+    async def run():
+        scheduler = PriorityScheduler(aging_rate=1.0)
+        scheduler.put("low", Priority.LOW)
+        _age(scheduler, Priority.LOW, 5)
+        scheduler.put("high", Priority.HIGH)
+        assert await scheduler.get_batch(1, 0) == ["low"]
+
+        stats = scheduler.stats()
+        assert stats[Priority.LOW.value]["dequeued"] == 1
+        assert stats[Priority.LOW.value]["max_wait_ms"] >= 5000
+        assert stats[Priority.HIGH.value]["depth"] == 1
+
+    asyncio.run(run())
+
+def test_get_batch_wakes_on_put():
+    async def run():
+        scheduler = PriorityScheduler()
+        waiting = asyncio.create_task(scheduler.get_batch(4, 0))
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+        scheduler.put("item", Priority.MEDIUM)
+        assert await asyncio.wait_for(waiting, 1) == ["item"]
+
+    asyncio.run(run())
+
+def test_put_raises_when_full():
+    scheduler = PriorityScheduler(max_queue_size=1)
+    scheduler.put("first", Priority.LOW)
+    with pytest.raises(asyncio.QueueFull):
+        scheduler.put("second", Priority.HIGH)
+
+def test_batches_group_similar_lengths_and_report_padding():
+    async def run():
+        scheduler = PriorityScheduler(max_delay_ms=60000)
+        scheduler.put("short-1", Priority.MEDIUM, length=10)
+        scheduler.put("long", Priority.MEDIUM, length=100)
+        scheduler.put("short-2", Priority.MEDIUM, length=10)
+
+        assert sorted(await scheduler.get_batch(2, 0)) == ["short-1", "short-2"]
+        assert await scheduler.get_batch(2, 0) == ["long"]
+        batching = scheduler.stats()["batching"]
+        assert batching["batches"] == 2
+        assert batching["average_batch_size"] == 1.5
+        assert batching["padding_efficiency"] == 1.0
+
+        scheduler.put("short", Priority.MEDIUM, length=10)
+        scheduler.put("long", Priority.MEDIUM, length=100)
+        await scheduler.get_batch(2, 0)
+        # 230 real tokens against 120 + 200 padded ones
+        assert scheduler.stats()["batching"]["padding_efficiency"] == pytest.approx(230 / 320)
+
+    asyncio.run(run())
+
+def test_overdue_items_are_taken_before_similar_lengths():
+    async def run():
+        scheduler = PriorityScheduler(max_delay_ms=100)
+        scheduler.put("anchor", Priority.HIGH, length=10)
+        scheduler.put("overdue", Priority.LOW, length=500)
+        _age(scheduler, Priority.LOW, 1)
+        scheduler.put("similar", Priority.LOW, length=10)
+        assert await scheduler.get_batch(2, 0) == ["anchor", "overdue"]
+
+    asyncio.run(run())
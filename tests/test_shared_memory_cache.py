@@ -0,0 +1,82 @@
+import asyncio
+import multiprocessing
+import numpy as np
+import pytest
+
+from src.services.cache_backends.shared_memory import SharedMemoryCacheBackend
+
+def _vector(seed: int, dim: int = 8) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+def _write_in_child(path: str):
+    async def write():
+        cache = SharedMemoryCacheBackend(path, dim=8, max_size=16, ways=4)
+        await cache.set("from-child", _vector(7))
+        await cache.close()
+
+    asyncio.run(write())
+
+def test_entries_are_read_across_instances(tmp_path):
+    async def run():
+        path = str(tmp_path / "cache")
+        writer = SharedMemoryCacheBackend(path, dim=8, max_size=16, ways=4)
+        reader = SharedMemoryCacheBackend(path, dim=8, max_size=16, ways=4)
+        try:
+            await writer.set("a", _vector(1))
+            np.testing.assert_array_equal(await reader.get("a"), _vector(1))
+            assert await reader.get("b") is None
+
+            await reader.set("a", _vector(2))
+            np.testing.assert_array_equal(await writer.get("a"), _vector(2))
+            assert writer.stats()["size"] == 1
+        finally:
+            await writer.close()
+            await reader.close()
+
+    asyncio.run(run())
+
+def test_entries_are_read_across_processes(tmp_path):
+    path = str(tmp_path / "cache")
+    process = multiprocessing.get_context("fork").Process(target=_write_in_child, args=(path,))
+    process.start()
+    process.join(10)
+    assert process.exitcode == 0
+
+    async def run():
+        cache = SharedMemoryCacheBackend(path, dim=8, max_size=16, ways=4)
+        try:
+            np.testing.assert_array_equal(await cache.get("from-child"), _vector(7))
+        finally:
+            await cache.close()
+
+    asyncio.run(run())
+
+def test_other_layouts_are_refused(tmp_path):
+    async def run():
+        path = str(tmp_path / "cache")
+        cache = SharedMemoryCacheBackend(path, dim=8, max_size=16)
+        try:
+            with pytest.raises(ValueError):
+                SharedMemoryCacheBackend(path, dim=16, max_size=16)
+        finally:
+            await cache.close()
+
+    asyncio.run(run())
+
+def test_full_buckets_evict_the_least_recently_accessed(tmp_path):
+    async def run():
+        cache = SharedMemoryCacheBackend(str(tmp_path / "cache"), dim=8, max_size=2, ways=2)
+        try:
+            await cache.set("key-0", _vector(0))
+            await cache.set("key-1", _vector(1))
+            cache._slots["accessed_at"][:] -= 10
+            assert await cache.get("key-0") is not None
+            await cache.set("key-2", _vector(2))
+
+            assert await cache.get("key-1") is None
+            assert await cache.get("key-0") is not None
+            assert await cache.get("key-2") is not None
+        finally:
+            await cache.close()
+
+    asyncio.run(run())
@@ -0,0 +1,156 @@
+from typing import List
+import asyncio
+import numpy as np
+
+from src.models.pydantic_models import EmbeddingRequest
+from src.services.backends import FakeBackend
+from src.services.cache_service import CacheService
+from src.services.chunking import split_into_chunks
+from src.services.request_tracker import RequestTracker
+from src.services.worker import WorkerService
+from tests.conftest import CountingBackend
+
+class FailingBackend(CountingBackend):
+    """CountingBackend whose forward pass raises while `failing` is set"""
+
+    failing = True
+
+    def forward(self, features: List[str]) -> np.ndarray:
+        if self.failing:
+            raise RuntimeError("model crashed")
+        return super().forward(features)
+
+def _worker(backend, **kwargs) -> WorkerService:
+    return WorkerService(CacheService(namespace="fake"), RequestTracker(), backend, **kwargs)
+
+async def _wait_finished(worker: WorkerService, request_ids: List[str]) -> dict:
+    """Poll the tracker until every request has completed or failed"""
+    for _ in range(200):
+        statuses = {
+            request_id: await worker.request_tracker.get_status(request_id)
+            for request_id in request_ids
+        }
+        if all(status.status in ("completed", "failed") for status in statuses.values()):
+            return statuses
+        await asyncio.sleep(0.01)
+    raise AssertionError("queued requests did not finish")
+
+def test_queued_requests_share_one_encode_call(backend):
+    async def run():
+        worker = _worker(backend)
+        worker.start()
+        try:
+            texts = ["first", "second", "third"]
+            for i, text in enumerate(texts):
+                await worker.queue_request(f"r{i}", EmbeddingRequest(text=text))
+            statuses = await _wait_finished(worker, ["r0", "r1", "r2"])
+
+            assert all(status.status == "completed" for status in statuses.values())
+            assert len(backend.calls) == 1 and sorted(backend.calls[0]) == sorted(texts)
+            for i, text in enumerate(texts):
+                result = await worker.request_tracker.get_result_payload(f"r{i}")
+                np.testing.assert_allclose(result["embedding"], backend.encode([text])[0])
+        finally:
+            await worker.close()
+
+    asyncio.run(run())
+
+def test_cached_requests_are_answered_without_encoding(backend):
+    async def run():
+        worker = _worker(backend)
+        worker.start()
+        try:
+            await worker.cache_service.set("cached", backend.encode(["cached"])[0])
+            await worker.queue_request("hit", EmbeddingRequest(text="cached"))
+            await worker.queue_request("miss", EmbeddingRequest(text="fresh"))
+            statuses = await _wait_finished(worker, ["hit", "miss"])
+
+            assert statuses["hit"].cache_hit and not statuses["miss"].cache_hit
+            assert backend.calls[-1] == ["fresh"]
+        finally:
+            await worker.close()
+
+    asyncio.run(run())
+
+def test_failed_batch_fails_its_requests_and_the_queue_keeps_going():
+    async def run():
+        backend = FailingBackend("fake", dimension=32, max_seq_length=128)
+        worker = _worker(backend)
+        worker.start()
+        try:
+            await worker.queue_request("a", EmbeddingRequest(text="a"))
+            await worker.queue_request("b", EmbeddingRequest(text="b"))
+            statuses = await _wait_finished(worker, ["a", "b"])
+            assert [statuses[r].status for r in ("a", "b")] == ["failed", "failed"]
+            assert statuses["a"].error == "model crashed"
+
+            backend.failing = False
+            await worker.queue_request("c", EmbeddingRequest(text="c"))
+            assert (await _wait_finished(worker, ["c"]))["c"].status == "completed"
+        finally:
+            await worker.close()
+
+    asyncio.run(run())
+
+def test_embed_many_deduplicates_and_keeps_order(backend):
+    async def run():
+        worker = _worker(backend)
+        try:
+            texts = ["b", "a", "b", "c", "a"]
+            vectors, hits = await worker.embed_many(texts)
+            assert backend.calls == [["b", "a", "c"]]
+            assert hits == [False] * 5
+            np.testing.assert_allclose(vectors, backend.encode(texts))
+
+            vectors, hits = await worker.embed_many(["c", "d", "c"])
+            assert backend.calls[-1] == ["d"]
+            assert hits == [True, False, True]
+            np.testing.assert_allclose(vectors, backend.encode(["c", "d", "c"]))
+        finally:
+            await worker.close()
+
+    asyncio.run(run())
+
+def test_embed_many_without_cache_encodes_every_unique_text(backend):
+    async def run():
+        worker = _worker(backend)
+        try:
+            await worker.embed_many(["x", "y"])
+            _, hits = await worker.embed_many(["x", "y", "x"], use_cache=False)
+            assert hits == [False, False, False]
+            assert backend.calls[-1] == ["x", "y"]
+        finally:
+            await worker.close()
+
+    asyncio.run(run())
+
+def test_embed_documents_pools_chunks_per_document():
+    async def run():
+        # A 10-token window with 4 tokens of overlap
+        backend = CountingBackend("fake", dimension=32, max_seq_length=12)
+        worker = _worker(backend, chunk_overlap_tokens=4)
+        try:
+            long_text = " ".join(f"w{i}" for i in range(20))
+            texts = [long_text, long_text, "short text"]
+            [spans] = split_into_chunks(backend.tokenizer, [long_text], window=10, overlap=4)
+            reference = FakeBackend("fake", dimension=32, max_seq_length=12)
+            chunks = reference.encode([long_text[start:end] for start, end, _ in spans])
+            tokens = np.array([count for _, _, count in spans], dtype=np.float32)
+
+            pooled, hits, per_chunk = await worker.embed_documents(
+                texts, pooling=["mean", "weighted", "mean"], return_chunks=True
+            )
+            np.testing.assert_allclose(pooled[0], chunks.mean(axis=0), rtol=1e-5)
+            np.testing.assert_allclose(pooled[1], (chunks * tokens[:, None]).sum(axis=0) / tokens.sum(), rtol=1e-5)
+            np.testing.assert_allclose(pooled[2], reference.encode(["short text"])[0], rtol=1e-6)
+            assert [len(doc_chunks) for doc_chunks in per_chunk] == [3, 3, 1]
+            assert hits == [False, False, False]
+            # Both copies of the long document share one encode of its chunks
+            assert len(backend.calls) == 1 and len(backend.calls[0]) == 4
+
+            _, hits, per_chunk = await worker.embed_documents([long_text, "new text"])
+            assert hits == [True, False] and per_chunk is None
+        finally:
+            await worker.close()
+
+    asyncio.run(run())